@@ -0,0 +1,217 @@
+"""Anti-aliased fonts with 4 bits of coverage per pixel.
+
+Glyphs are stored column after column, two pixels per byte, high nibble
+first.  A coverage of 0 is background and 15 is full color, the levels in
+between are blended through blend.lut.  For speed every byte is turned
+into its two pixels with one lookup in a 256 entry table built per color
+pair, so rendering does no arithmetic per pixel:
+    font = AAFont('fonts/Unispace24.aaf')
+    display.draw_text(0, 0, 'Smooth', font, 0xFFFF, 0x0010)
+
+Fonts are converted on the host from TrueType files (needs Pillow):
+    python aa_font.py fonts/Unispace.ttf 24 fonts/Unispace24.aaf
+
+File layout (little-endian):
+    header   magic b'AAF4', width, height (B), first letter, letter count (H)
+    widths   letter count bytes
+    letters  letter count slots of (width * height + 1) // 2 bytes
+"""
+try:
+    import ustruct as struct
+except ImportError:
+    import struct
+
+from st7789 import Color
+
+_MAGIC = b'AAF4'
+_HEADER = '<4sBBHH'
+
+
+class AAFont(object):
+    """Font with 4-bit anti-aliased glyphs.
+
+    Same interface as XglcdFont, so it can be drawn with ST7789.draw_text.
+
+    Attributes:
+        width: Maximum pixel width of font
+        height: Pixel height of font
+        start_letter: ASCII number of first letter
+        letter_count: Total number of letters
+    """
+
+    def __init__(self, path):
+        """Constructor for AAFont object.
+
+        Args:
+            path (string): Full path of font file.
+        """
+        with open(path, 'rb') as f:
+            header = f.read(struct.calcsize(_HEADER))
+            (magic, self.width, self.height, self.start_letter,
+             self.letter_count) = struct.unpack(_HEADER, header)
+            if magic != _MAGIC:
+                raise ValueError('Not an anti-aliased font file: ' + path)
+            self.widths = bytearray(self.letter_count)
+            f.readinto(self.widths)
+            self.bytes_per_letter = (self.width * self.height + 1) // 2
+            self.letters = bytearray(self.bytes_per_letter * self.letter_count)
+            f.readinto(self.letters)
+        self._colors = None
+        self._pairs = bytearray(256 * 4)
+
+    def _pair_table(self, color, background):
+        """Return pixel pairs of every byte for a color pair, built once."""
+        colors = (color, background)
+        if colors != self._colors:
+            from blend import lut
+            if isinstance(color, Color):
+                color = color.value
+            if isinstance(background, Color):
+                background = background.value
+            table = lut(color, background)
+            pairs = self._pairs
+            for b in range(256):
+                hi = (b >> 4) * 2
+                lo = (b & 0x0F) * 2
+                pos = b * 4
+                pairs[pos] = table[hi]
+                pairs[pos + 1] = table[hi + 1]
+                pairs[pos + 2] = table[lo]
+                pairs[pos + 3] = table[lo + 1]
+            self._colors = colors
+        return memoryview(self._pairs)
+
+    def get_letter(self, letter, color, background=0, landscape=False):
+        """Convert letter coverage data to pixels.
+
+        Args:
+            letter (string): Letter to return, width 0 if not in the font.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+            landscape (bool): Ignored, ST7789.draw_text rotates portrait
+                data in hardware.
+        Returns:
+            (memoryview): Pixel data.
+            (int, int): Letter width and height.
+        """
+        letter_ord = ord(letter) - self.start_letter
+        if not 0 <= letter_ord < self.letter_count:
+            return b'', 0, 0
+        letter_width = self.widths[letter_ord]
+        size = (letter_width * self.height + 1) // 2
+        offset = letter_ord * self.bytes_per_letter
+        pairs = self._pair_table(color, background)
+        # Two pixels of 2 bytes per data byte
+        buf = bytearray(size * 4)
+        mv = memoryview(buf)
+        pos = 0
+        for b in memoryview(self.letters)[offset:offset + size]:
+            b *= 4
+            mv[pos:pos + 4] = pairs[b:b + 4]
+            pos += 4
+        return (mv[:letter_width * self.height * 2], letter_width,
+                self.height)
+
+    def codepoints(self):
+        """Return the codepoints of all letters in the font."""
+        return range(self.start_letter, self.start_letter + self.letter_count)
+
+    def measure_text(self, text, spacing=1):
+        """Measure length of text string in pixels.
+
+        Args:
+            text (string): Text string to measure
+            spacing (optional int): Pixel spacing between letters.  Default: 1.
+        Returns:
+            int: length of text
+        """
+        length = 0
+        for letter in text:
+            letter_ord = ord(letter) - self.start_letter
+            if not 0 <= letter_ord < self.letter_count:
+                continue
+            length += self.widths[letter_ord] + spacing
+        return length
+
+
+def write_aa_font(path, glyphs, height, start_letter=32):
+    """Write coverage data of consecutive letters to a font file.
+
+    Args:
+        path (string): Output file.
+        glyphs (list): (width, levels) of every letter from start_letter on,
+            levels holding width * height coverage values 0-15 column
+            after column.
+        height (int): Pixel height of letters.
+        start_letter (int): Codepoint of the first letter (default: 32).
+    """
+    width = max(w for w, _ in glyphs)
+    slot = (width * height + 1) // 2
+    with open(path, 'wb') as f:
+        f.write(struct.pack(_HEADER, _MAGIC, width, height, start_letter,
+                            len(glyphs)))
+        f.write(bytes(w for w, _ in glyphs))
+        for w, levels in glyphs:
+            data = bytearray(slot)
+            for i, level in enumerate(levels):
+                data[i >> 1] |= level << 4 if i & 1 == 0 else level
+            f.write(data)
+
+
+def render_ttf(path, size, start_letter=32, letter_count=95, height=None):
+    """Render letters of a TrueType font to 4-bit coverage (needs Pillow).
+
+    Args:
+        path (string): TrueType or OpenType font file.
+        size (int): Font size in pixels.
+        start_letter (int): Codepoint of the first letter (default: 32).
+        letter_count (int): Number of letters (default: 95, printable ASCII).
+        height (int): Letter height (default: font ascent plus descent).
+    Returns:
+        list: (width, levels) of every letter, as write_aa_font takes them.
+        int: Letter height.
+    """
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError:
+        raise ImportError('Pillow is required to render TrueType fonts')
+    font = ImageFont.truetype(path, size)
+    if height is None:
+        ascent, descent = font.getmetrics()
+        height = ascent + descent
+    glyphs = []
+    for codepoint in range(start_letter, start_letter + letter_count):
+        letter = chr(codepoint)
+        width = min(max(int(round(font.getlength(letter))), 1), 255)
+        img = Image.new('L', (width, height))
+        ImageDraw.Draw(img).text((0, 0), letter, fill=255, font=font)
+        pixels = img.load()
+        levels = [(pixels[x, y] * 15 + 127) // 255
+                  for x in range(width) for y in range(height)]
+        glyphs.append((width, levels))
+    return glyphs, height
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Convert a TrueType font to a 4-bit anti-aliased font.')
+    parser.add_argument('font', help='TrueType or OpenType font file')
+    parser.add_argument('size', type=int, help='font size in pixels')
+    parser.add_argument('output', help='anti-aliased font file to write')
+    parser.add_argument('--start', type=lambda s: int(s, 0), default=32,
+                        help='first codepoint (default: 32)')
+    parser.add_argument('--count', type=int, default=95,
+                        help='number of letters (default: 95)')
+    parser.add_argument('--height', type=int,
+                        help='letter height (default: ascent + descent)')
+    args = parser.parse_args(argv)
+    glyphs, height = render_ttf(args.font, args.size, args.start, args.count,
+                                args.height)
+    write_aa_font(args.output, glyphs, height, args.start)
+    print('{0}: {1} letters, {2} pixels high'.format(args.output, len(glyphs),
+                                                    height))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""RGB565 alpha blending with precomputed channel tables.
+
+Buffers hold big-endian RGB565 pixels as used by ST7789.blit_buffer.  Alpha
+is a 4-bit value: 0 keeps the destination, 15 replaces it with the source.
+Per channel results come from tables of value * alpha / 15 for every alpha
+level, so blending needs only lookups, adds and shifts.
+"""
+from st7789 import ticks_us, ticks_diff
+
+ALPHA_MAX = 15
+
+
+def _make_table(size):
+    table = bytearray(size * (ALPHA_MAX + 1))
+    for a in range(ALPHA_MAX + 1):
+        for v in range(size):
+            table[a * size + v] = (v * a + 7) // ALPHA_MAX
+    return table
+
+
+# 5-bit (red, blue) and 6-bit (green) channel tables, one row per alpha
+_T5 = _make_table(32)
+_T6 = _make_table(64)
+_MV5 = memoryview(_T5)
+_MV6 = memoryview(_T6)
+
+
+def blend565(fg, bg, alpha):
+    """Blend two RGB565 colors.
+
+    Args:
+        fg (int): RGB565 foreground color.
+        bg (int): RGB565 background color.
+        alpha (int): Foreground opacity 0-15.
+    Returns:
+        int: Blended RGB565 color.
+    """
+    a5 = alpha * 32
+    b5 = (ALPHA_MAX - alpha) * 32
+    a6 = alpha * 64
+    b6 = (ALPHA_MAX - alpha) * 64
+    return ((_T5[a5 + (fg >> 11)] + _T5[b5 + (bg >> 11)]) << 11 |
+            (_T6[a6 + ((fg >> 5) & 0x3F)] +
+             _T6[b6 + ((bg >> 5) & 0x3F)]) << 5 |
+            _T5[a5 + (fg & 0x1F)] + _T5[b5 + (bg & 0x1F)])
+
+
+def lut(fg, bg):
+    """Return the 16 blend levels of two colors as big-endian pixel bytes.
+
+    Args:
+        fg (int): RGB565 color at alpha 15.
+        bg (int): RGB565 color at alpha 0.
+    Returns:
+        bytearray: 32 bytes, pixel for alpha a at offset 2 * a.
+    """
+    table = bytearray(2 * (ALPHA_MAX + 1))
+    for a in range(ALPHA_MAX + 1):
+        color = blend565(fg, bg, a)
+        table[2 * a] = color >> 8
+        table[2 * a + 1] = color & 0xFF
+    return table
+
+
+def blend(dst, src, alpha):
+    """Blend a source buffer over a destination buffer in place.
+
+    Args:
+        dst (bytearray): RGB565 destination (background) pixels.
+        src (bytes): RGB565 source pixels, same length as dst.
+        alpha (int): Constant source opacity 0-15.
+    """
+    if alpha <= 0:
+        return
+    if alpha >= ALPHA_MAX:
+        dst[:] = src
+        return
+    fa5 = _MV5[alpha * 32:]
+    fb5 = _MV5[(ALPHA_MAX - alpha) * 32:]
+    fa6 = _MV6[alpha * 64:]
+    fb6 = _MV6[(ALPHA_MAX - alpha) * 64:]
+    for i in range(0, len(dst), 2):
+        hi = src[i]
+        lo = src[i + 1]
+        dhi = dst[i]
+        dlo = dst[i + 1]
+        g = (fa6[(hi & 7) << 3 | lo >> 5] +
+             fb6[(dhi & 7) << 3 | dlo >> 5])
+        dst[i] = (fa5[hi >> 3] + fb5[dhi >> 3]) << 3 | g >> 3
+        dst[i + 1] = (g & 7) << 5 | (fa5[lo & 0x1F] + fb5[dlo & 0x1F])
+
+
+def blend_mask(dst, src, mask):
+    """Blend a source buffer over a destination using a 4-bit alpha mask.
+
+    Args:
+        dst (bytearray): RGB565 destination (background) pixels.
+        src (bytes): RGB565 source pixels, same length as dst.
+        mask (bytes): Alpha per pixel, two pixels per byte (high nibble
+            first), 0-15 each.
+    """
+    t5 = _T5
+    t6 = _T6
+    for i in range(0, len(dst), 2):
+        m = mask[i >> 2]
+        a = m >> 4 if not i & 2 else m & 0x0F
+        if not a:
+            continue
+        if a == ALPHA_MAX:
+            dst[i] = src[i]
+            dst[i + 1] = src[i + 1]
+            continue
+        a5 = a * 32
+        b5 = (ALPHA_MAX - a) * 32
+        hi = src[i]
+        lo = src[i + 1]
+        dhi = dst[i]
+        dlo = dst[i + 1]
+        g = (t6[a * 64 + ((hi & 7) << 3 | lo >> 5)] +
+             t6[(ALPHA_MAX - a) * 64 + ((dhi & 7) << 3 | dlo >> 5)])
+        dst[i] = (t5[a5 + (hi >> 3)] + t5[b5 + (dhi >> 3)]) << 3 | g >> 3
+        dst[i + 1] = (g & 7) << 5 | (t5[a5 + (lo & 0x1F)] +
+                                     t5[b5 + (dlo & 0x1F)])
+
+
+def blend_blit(display, x, y, w, h, src, background, alpha=ALPHA_MAX,
+               mask=None):
+    """Composite a source buffer onto a background and draw the result.
+
+    Args:
+        display (ST7789): Display object.
+        x, y (int): Top left corner.
+        w, h (int): Size of the buffers in pixels.
+        src (bytes): RGB565 source pixels.
+        background (bytearray, bytes, int or Color): RGB565 background
+            pixels or a background color.  A bytearray or memoryview is
+            blended in place, bytes are copied first.
+        alpha (int): Constant source opacity 0-15 (default: 15).
+        mask (bytes): Optional 4-bit alpha mask, overrides alpha.
+    """
+    if isinstance(background, bytes):
+        background = bytearray(background)
+    elif not isinstance(background, (bytearray, memoryview)):
+        background = bytearray(background.to_bytes(2, 'big') * (w * h))
+    if mask is not None:
+        blend_mask(background, src, mask)
+    else:
+        blend(background, src, alpha)
+    display.draw_sprite(background, x, y, w, h)
+
+
+def blend_naive(dst, src, alpha):
+    """Reference blend that unpacks, mixes and repacks every pixel."""
+    for i in range(0, len(dst), 2):
+        f = src[i] << 8 | src[i + 1]
+        b = dst[i] << 8 | dst[i + 1]
+        fr, fg, fb = (f >> 8) & 0xF8, (f >> 3) & 0xFC, (f << 3) & 0xF8
+        br, bg, bb = (b >> 8) & 0xF8, (b >> 3) & 0xFC, (b << 3) & 0xF8
+        r = (fr * alpha + br * (ALPHA_MAX - alpha)) // ALPHA_MAX
+        g = (fg * alpha + bg * (ALPHA_MAX - alpha)) // ALPHA_MAX
+        b = (fb * alpha + bb * (ALPHA_MAX - alpha)) // ALPHA_MAX
+        color = (r & 0xF8) << 8 | (g & 0xFC) << 3 | b >> 3
+        dst[i] = color >> 8
+        dst[i + 1] = color & 0xFF
+
+
+def benchmark(pixels=1024, alpha=7):
+    """Time table blending against the naive implementation.
+
+    Args:
+        pixels (int): Pixels per buffer (default: 1024).
+        alpha (int): Alpha level used (default: 7).
+    Returns:
+        dict: Microseconds per pixel for blend, blend_mask and blend_naive.
+    """
+    src = bytearray(range(256)) * (pixels * 2 // 256 + 1)
+    src = src[:pixels * 2]
+    mask = bytearray([alpha << 4 | alpha]) * (pixels // 2)
+    result = {}
+    for name, func, arg in (('blend', blend, alpha),
+                            ('blend_mask', blend_mask, mask),
+                            ('blend_naive', blend_naive, alpha)):
+        dst = bytearray(b'\x5a\xa5') * pixels
+        start = ticks_us()
+        func(dst, src, arg)
+        result[name] = ticks_diff(ticks_us(), start) / pixels
+    return result
@@ -0,0 +1,173 @@
+"""Scrolling text console for ST7789 displays using sysfont style fonts."""
+
+
+class Console(object):
+    """Ring buffer text console.
+
+    Attributes:
+        rows (int): Number of text lines visible on screen.
+        cols (int): Number of characters per line.
+        cursor (int, int): Column and line of the next character.
+
+    Note:
+        Each new line costs a single window write of one text row, no matter
+        how many lines are visible.  With hardware scrolling the ST7789
+        vertical scroll start address is moved one text row per new line.
+        Without it the console wraps to the top and clears the line after
+        the cursor to mark the end of the log.
+    """
+
+    def __init__(self, display, font, color=0xFFFF, background=0,
+                 hw_scroll=True):
+        """Constructor for Console object.
+
+        Args:
+            display (ST7789): Display object.
+            font (dict): Font in sysfont format (Width, Height, Start, End,
+                Data; each byte is a column of pixels).
+            color (int): RGB565 text color (default: white).
+            background (int): RGB565 background color (default: black).
+            hw_scroll (bool): Use the ST7789 vertical scroll when the display
+                is not rotated (default: True).
+        """
+        self.display = display
+        self.font = font
+        self.color = color
+        self.background = background
+        self.cell_width = font["Width"] + 1
+        self.line_height = font["Height"]
+        self.cols = display.width // self.cell_width
+        self.rows = display.height // self.line_height
+        # Vertical scrolling follows GRAM rows, so only works unrotated
+        self.hw_scroll = hw_scroll and display.rotation == 0
+        # Ring buffer of line strings; _head is the slot of the oldest line
+        self._lines = [''] * self.rows
+        self._head = 0
+        self._count = 1
+        self._col = 0
+        # Reused line buffer and its blank pattern
+        self._buf = bytearray(display.width * self.line_height * 2)
+        self._blank = background.to_bytes(2, 'big') * (
+            display.width * self.line_height)
+        self._fg = color.to_bytes(2, 'big')
+        if self.hw_scroll:
+            ystart = display.ystart
+            area = self.rows * self.line_height
+            display.vscrdef(ystart, area, 320 - ystart - area)
+            display.vscsad(ystart)
+        self.clear()
+
+    @property
+    def cursor(self):
+        """Return cursor column and visible line."""
+        return self._col, self._count - 1
+
+    def clear(self):
+        """Clear the screen and the line buffer."""
+        for i in range(self.rows):
+            self._lines[i] = ''
+        self._head = 0
+        self._count = 1
+        self._col = 0
+        if self.hw_scroll:
+            self.display.vscsad(self.display.ystart)
+        self.display.fill_rectangle(0, 0, self.display.width,
+                                    self.rows * self.line_height,
+                                    self.background)
+
+    def write(self, text):
+        """Append text, wrapping long lines and scrolling on new lines.
+
+        Args:
+            text (string): Text to append; '\\n' starts a new line.
+        """
+        slot = (self._head + self._count - 1) % self.rows
+        line = self._lines[slot]
+        dirty = False
+        for c in text:
+            if c == '\n':
+                if dirty:
+                    self._lines[slot] = line
+                    self._draw_slot(slot)
+                    dirty = False
+                slot = self._newline()
+                line = ''
+                continue
+            if self._col >= self.cols:
+                self._lines[slot] = line
+                self._draw_slot(slot)
+                dirty = False
+                slot = self._newline()
+                line = ''
+            line += c
+            self._col += 1
+            dirty = True
+        if dirty:
+            self._lines[slot] = line
+            self._draw_slot(slot)
+
+    def print(self, *args):
+        """Print arguments separated by spaces followed by a new line."""
+        self.write(' '.join(str(a) for a in args) + '\n')
+
+    def redraw(self):
+        """Redraw every visible line (e.g. after the screen was overwritten)."""
+        for slot in range(self.rows):
+            self._draw_slot(slot)
+
+    def _newline(self):
+        """Advance to a new line and return its ring buffer slot."""
+        self._col = 0
+        if self._count < self.rows:
+            self._count += 1
+            slot = (self._head + self._count - 1) % self.rows
+        else:
+            # Oldest line is dropped and its slot reused for the new one
+            slot = self._head
+            self._head = (self._head + 1) % self.rows
+            if self.hw_scroll:
+                self.display.vscsad(self.display.ystart +
+                                    self._head * self.line_height)
+        self._lines[slot] = ''
+        self._draw_slot(slot)
+        if not self.hw_scroll and self._count == self.rows:
+            # Wrapping mode: blank the line after the cursor as end marker
+            self._draw_slot((slot + 1) % self.rows, blank=True)
+        return slot
+
+    def _draw_slot(self, slot, blank=False):
+        """Render one line of text into the line buffer and write it out.
+
+        Args:
+            slot (int): Ring buffer slot to draw.
+            blank (bool): Only clear the line (default: False).
+        """
+        font = self.font
+        buf = self._buf
+        buf[:] = self._blank
+        if not blank:
+            data = font["Data"]
+            fw = font["Width"]
+            start = font["Start"]
+            end = font["End"]
+            msb, lsb = self._fg
+            stride = self.display.width * 2
+            x = 0
+            for c in self._lines[slot]:
+                ci = ord(c)
+                if start <= ci <= end:
+                    ci = (ci - start) * fw
+                    for q in range(fw):
+                        bits = data[ci + q]
+                        pos = (x + q) * 2
+                        while bits:
+                            if bits & 0x01:
+                                buf[pos] = msb
+                                buf[pos + 1] = lsb
+                            bits >>= 1
+                            pos += stride
+                x += self.cell_width
+        # Slots map to fixed GRAM rows, hardware scrolling moves over them
+        self.display.blit_buffer(buf, 0, slot * self.line_height,
+                                 self.display.width,
+                                 self.line_height)
@@ -2,7 +2,9 @@
 from machine import Pin, SPI
 from random import random, seed
 from st7789 import ST7789, color565
-from utime import sleep_us, ticks_cpu, ticks_us, ticks_diff
+from utime import ticks_cpu
+from frame_loop import FrameLoop
+from motion import MotionUpdater
 
 
 class Box(object):
@@ -32,8 +34,6 @@ class Box(object):
 
         self.x = self.w / 2.0
         self.y = self.h / 2.0
-        self.prev_x = self.x
-        self.prev_y = self.y
 
     def update_pos(self):
         """Update box position and speed."""
@@ -44,8 +44,6 @@ class Box(object):
         h = self.h
         x_speed = abs(self.x_speed)
         y_speed = abs(self.y_speed)
-        self.prev_x = x
-        self.prev_y = y
 
         if x + size >= w - x_speed:
             self.x_speed = -x_speed
@@ -60,23 +58,15 @@ class Box(object):
         self.x = x + self.x_speed
         self.y = y + self.y_speed
 
-    def draw(self):
-        """Draw box."""
-        x = int(self.x)
-        y = int(self.y)
-        size = self.size
-        prev_x = int(self.prev_x)
-        prev_y = int(self.prev_y)
-        self.display.fill_hrect(prev_x - size,
-                                prev_y - size,
-                                size, size, 0)
-        self.display.fill_hrect(x - size,
-                                y - size,
-                                size, size, self.color)
+    def draw(self, x, y):
+        """Draw box at x, y."""
+        self.display.fill_rect(x, y, self.size, self.size, self.color)
 
 
 def test():
     """Bouncing box."""
+    display = None
+    loop = None
     try:
         # Baud rate of 14500000 seems about the max
         BL_Pin = 4     #backlight pin
@@ -107,18 +97,29 @@ def test():
         boxes = [Box(135, 240, sizes[i], display,
                  colors[i]) for i in range(6)]
 
-        while True:
-            timer = ticks_us()
+        def update():
             for b in boxes:
                 b.update_pos()
-                b.draw()
-            # Attempt to set framerate to 30 FPS
-            timer_dif = 33333 - ticks_diff(ticks_us(), timer)
-            if timer_dif > 0:
-                sleep_us(timer_dif)
+
+        # Only the edges uncovered since the last drawn frame are erased
+        updater = MotionUpdater(display, background=0)
+
+        def draw():
+            for b in boxes:
+                updater.move(b, int(b.x) - b.size, int(b.y) - b.size,
+                             b.size, b.size, b.draw)
+            updater.flush()
+
+        # Attempt to set framerate to 30 FPS
+        loop = FrameLoop(update, draw, fps=30)
+        loop.run()
 
     except KeyboardInterrupt:
-        display.cleanup()
+        # Interrupted during setup, before the loop or display existed
+        if loop is not None:
+            print(loop.stats())
+        if display is not None:
+            display.cleanup()
 
 
 test()
@@ -1,3 +1,4 @@
+from array import array
 from time import sleep
 from st7789 import ST7789, color565
 from machine import Pin, SPI
@@ -55,12 +56,16 @@ def test():
     display = ST7789(spi, 135, 240, cs=Pin(CS_Pin), dc=Pin(DC_Pin), rst=None)
     BLK.value(1)
 
+    # Draw the whole palette in one batch call
+    circles = array('h')
+    colors = array('H')
     c = 0
     for x in range(0, 128, 16):
         for y in range(0, 240, 16):
-            color = color565(*hsv_to_rgb(c / 64, 1, 1))
-            display.fill_circle(x + 8, y + 7, 7, color)
+            colors.append(color565(*hsv_to_rgb(c / 64, 1, 1)))
+            circles.extend((x + 8, y + 7, 7))
             c += 1
+    display.fill_circles(circles, colors)
     sleep(9)
     display.cleanup()
 
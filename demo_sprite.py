@@ -1,6 +1,7 @@
 from st7789 import ST7789
 from machine import Pin, SPI
-from utime import sleep_us, ticks_us, ticks_diff
+from frame_loop import FrameLoop
+from motion import MotionUpdater
 
 BL_Pin = 4     #backlight pin
 SCLK_Pin = 18  #clock pin
@@ -37,8 +38,6 @@ class BouncingSprite(object):
         self.y_speed = speed
         self.x = self.screen_width // 2
         self.y = self.screen_height // 2
-        self.prev_x = self.x
-        self.prev_y = self.y
 
     def update_pos(self):
         """Update sprite speed and position."""
@@ -59,42 +58,18 @@ class BouncingSprite(object):
         elif y - y_speed <= 0:
             self.y_speed = y_speed
 
-        self.prev_x = x
-        self.prev_y = y
-
         self.x = x + self.x_speed
         self.y = y + self.y_speed
 
-    def draw(self):
-        """Draw sprite."""
-        x = self.x
-        y = self.y
-        prev_x = self.prev_x
-        prev_y = self.prev_y
-        w = self.w
-        h = self.h
-        x_speed = abs(self.x_speed)
-        y_speed = abs(self.y_speed)
-
-        # Determine direction and remove previous portion of sprite
-        if prev_x > x:
-            # Left
-            self.display.fill_vrect(x + w, prev_y, x_speed, h, 0)
-        elif prev_x < x:
-            # Right
-            self.display.fill_vrect(x - x_speed, prev_y, x_speed, h, 0)
-        if prev_y > y:
-            # Upward
-            self.display.fill_vrect(prev_x, y + h, w, y_speed, 0)
-        elif prev_y < y:
-            # Downward
-            self.display.fill_vrect(prev_x, y - y_speed, w, y_speed, 0)
-
-        self.display.draw_sprite(self.buf, x, y, w, h)
+    def draw(self, x, y):
+        """Draw sprite at x, y."""
+        self.display.draw_sprite(self.buf, x, y, self.w, self.h)
 
 
 def test():
     """Bouncing sprite."""
+    display = None
+    loop = None
     try:
         # Baud rate of 14500000 seems about the max
         BLK = Pin(BL_Pin, Pin.OUT)
@@ -107,17 +82,23 @@ def test():
         logo = BouncingSprite('images/Python41x49.raw',
                               41, 49, 135, 240, 1, display)
 
-        while True:
-            timer = ticks_us()
-            logo.update_pos()
-            logo.draw()
-            # Attempt to set framerate to 30 FPS
-            timer_dif = 33333 - ticks_diff(ticks_us(), timer)
-            if timer_dif > 0:
-                sleep_us(timer_dif)
+        # Only the edges uncovered since the last drawn frame are erased
+        updater = MotionUpdater(display, background=0)
+
+        def draw():
+            updater.move(logo, logo.x, logo.y, logo.w, logo.h, logo.draw)
+            updater.flush()
+
+        # Attempt to set framerate to 30 FPS
+        loop = FrameLoop(logo.update_pos, draw, fps=30)
+        loop.run()
 
     except KeyboardInterrupt:
-        display.cleanup()
+        # Interrupted during setup, before the loop or display existed
+        if loop is not None:
+            print(loop.stats())
+        if display is not None:
+            display.cleanup()
 
 
 test()
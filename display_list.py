@@ -0,0 +1,115 @@
+"""Retained-mode display list with frame to frame diffing."""
+
+
+def _intersects(a, b):
+    """Check if two (x, y, w, h) rectangles overlap."""
+    return (a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and
+            a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+
+class DisplayList(object):
+    """Record draw operations and redraw only what changed between frames.
+
+    Operations are recorded for a frame and sent by flush().  An operation
+    identical to one of the previous frame is skipped unless something drawn
+    or cleared before it overlaps its bounding box, or it now comes after an
+    overlapping operation it came before.  Regions of operations that
+    disappeared are filled with the background color.
+
+    Note:
+        Buffers (sprites) are compared by identity, not content.  Pass a new
+        buffer or call invalidate() after changing one in place.
+    """
+
+    def __init__(self, display, background=0):
+        """Constructor for DisplayList object.
+
+        Args:
+            display (ST7789): Display object.
+            background (int): RGB565 color used to clear vacated regions.
+        """
+        self.display = display
+        self.background = background
+        self._prev = {}
+        self._ops = []
+
+    def add(self, bbox, method, *args):
+        """Record a call of a display method.
+
+        Args:
+            bbox ((int, int, int, int)): X, Y, width and height the call
+                draws over.
+            method (string): Name of the ST7789 method.
+            args: Arguments of the call; must be hashable or buffers.
+        """
+        key = (method,) + tuple(
+            id(a) if isinstance(a, (bytes, bytearray, memoryview)) else a
+            for a in args)
+        self._ops.append((key, bbox, method, args))
+
+    def fill_rectangle(self, x, y, w, h, color):
+        """Record ST7789.fill_rectangle."""
+        self.add((x, y, w, h), 'fill_rectangle', x, y, w, h, color)
+
+    def draw_text(self, x, y, text, font, color, background=0,
+                  landscape=False, spacing=1):
+        """Record ST7789.draw_text."""
+        w = font.measure_text(text, spacing)
+        h = font.height
+        bbox = (x, y - w, h, w) if landscape else (x, y, w, h)
+        self.add(bbox, 'draw_text', x, y, text, font, color, background,
+                 landscape, spacing)
+
+    def draw_sprite(self, buf, x, y, w, h):
+        """Record ST7789.draw_sprite."""
+        self.add((x, y, w, h), 'draw_sprite', buf, x, y, w, h)
+
+    def draw_image(self, path, x=0, y=0, w=128, h=128):
+        """Record ST7789.draw_image."""
+        self.add((x, y, w, h), 'draw_image', path, x, y, w, h)
+
+    def invalidate(self):
+        """Forget the previous frame so the next flush redraws everything."""
+        self._prev = {}
+
+    def flush(self):
+        """Draw the recorded frame, sending only changed operations.
+
+        Returns:
+            int: Number of draw and clear calls sent to the display.
+        """
+        display = self.display
+        prev = self._prev
+        # Position of every operation in its frame, to see order changes
+        current = {}
+        for i, op in enumerate(self._ops):
+            current[op[0]] = (i, op)
+        # Clear regions whose operation is gone
+        dirty = [old[1][1] for key, old in prev.items() if key not in current]
+        for x, y, w, h in dirty:
+            display.fill_rectangle(x, y, w, h, self.background)
+        sent = len(dirty)
+        # Previous position and bounding box of operations left as they were
+        kept = []
+        for key, bbox, method, args in self._ops:
+            old = prev.get(key)
+            if old is not None:
+                for rect in dirty:
+                    if _intersects(bbox, rect):
+                        break
+                else:
+                    # Overlapping operations drawn after it last frame are
+                    # now below it
+                    for pos, rect in kept:
+                        if pos > old[0] and _intersects(bbox, rect):
+                            break
+                    else:
+                        kept.append((old[0], bbox))
+                        continue
+            getattr(display, method)(*args)
+            # Later operations on top of this one have to be redrawn too
+            dirty.append(bbox)
+            sent += 1
+        self._prev = current
+        self._ops = []
+        return sent
@@ -0,0 +1,184 @@
+"""Double-buffered rendering with a background flush thread.
+
+The application renders into the back buffer while a worker thread sends the
+front buffer to the display.  On a dual-core ESP32 (or CPython with a mock
+bus) frame time approaches max(render, transfer) instead of their sum.
+
+The display must not be used from other threads while a flush is running;
+call wait() first.
+"""
+import _thread
+from st7789 import ticks_us, ticks_diff
+
+
+class DoubleBuffer(object):
+    """Two RGB565 buffers for a screen region flushed by a worker thread.
+
+    Attributes:
+        back (bytearray): Buffer to render into (big-endian RGB565).
+        swaps (int): Number of swap() calls.
+        wait_us (int): Total time swap() spent waiting for a flush.
+    """
+
+    def __init__(self, display, x=0, y=0, w=None, h=None):
+        """Constructor for DoubleBuffer object.
+
+        Args:
+            display (ST7789): Display object.
+            x, y (int): Top left corner of the region (default: 0, 0).
+            w, h (int): Size of the region, e.g. a band of rows (default:
+                whole screen).
+        """
+        self.display = display
+        self.x = x
+        self.y = y
+        self.w = display.width - x if w is None else w
+        self.h = display.height - y if h is None else h
+        size = self.w * self.h * 2
+        self.back = bytearray(size)
+        self._front = bytearray(size)
+        self._target = (x, y)
+        self.swaps = 0
+        self.wait_us = 0
+        # _work is released to start a flush, _idle is held during one
+        self._work = _thread.allocate_lock()
+        self._work.acquire()
+        self._idle = _thread.allocate_lock()
+        self._error = None
+        self._running = True
+        _thread.start_new_thread(self._worker, ())
+
+    def _worker(self):
+        while True:
+            self._work.acquire()
+            if not self._running:
+                self._idle.release()
+                return
+            x, y = self._target
+            try:
+                self.display.blit_buffer(self._front, x, y, self.w, self.h)
+            except Exception as e:
+                # Reported by the next swap() or wait()
+                self._error = e
+            finally:
+                self._idle.release()
+
+    def _raise_error(self):
+        """Re-raise an exception of the last flush, with _idle held."""
+        error = self._error
+        if error is not None:
+            self._error = None
+            self._idle.release()
+            raise error
+
+    def swap(self, x=None, y=None):
+        """Flush the back buffer in the background and swap buffers.
+
+        Blocks only while the previous flush is still running.  An
+        exception raised by that flush is raised here.
+
+        Args:
+            x, y (int): Optional new position of the region, so one band
+                buffer can be flushed to several places on screen.
+        """
+        start = ticks_us()
+        self._idle.acquire()
+        self.wait_us += ticks_diff(ticks_us(), start)
+        self._raise_error()
+        if x is not None:
+            self.x = x
+        if y is not None:
+            self.y = y
+        self._front, self.back = self.back, self._front
+        self._target = (self.x, self.y)
+        self.swaps += 1
+        self._work.release()
+
+    def wait(self):
+        """Block until the last flush has finished.
+
+        Raises the exception of the last flush, if it failed.
+        """
+        self._idle.acquire()
+        self._raise_error()
+        self._idle.release()
+
+    def stop(self):
+        """Finish the last flush and end the worker thread."""
+        self._idle.acquire()
+        self._running = False
+        self._work.release()
+        # The worker releases _idle on its way out
+        self._idle.acquire()
+        self._idle.release()
+
+    def _clip(self, x, y, w, h):
+        """Clip a rectangle to the buffer, like ST7789._clip.
+
+        Returns:
+            (int, int, int, int): Visible x, y, w, h or None if nothing is
+                visible.
+        """
+        x0 = x if x > 0 else 0
+        y0 = y if y > 0 else 0
+        x1 = x + w
+        y1 = y + h
+        if x1 > self.w:
+            x1 = self.w
+        if y1 > self.h:
+            y1 = self.h
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1 - x0, y1 - y0
+
+    def fill_rect(self, x, y, w, h, color):
+        """Fill a rectangle of the back buffer, clipped to it.
+
+        Args:
+            x, y (int): Top left corner relative to the region.
+            w, h (int): Size of the rectangle.
+            color (int): RGB565 color value.
+        """
+        clip = self._clip(x, y, w, h)
+        if clip is None:
+            return
+        x, y, w, h = clip
+        row = color.to_bytes(2, 'big') * w
+        stride = self.w * 2
+        pos = (y * self.w + x) * 2
+        mv = memoryview(self.back)
+        for _ in range(h):
+            mv[pos:pos + w * 2] = row
+            pos += stride
+
+    def fill(self, color):
+        """Fill the whole back buffer."""
+        self.fill_rect(0, 0, self.w, self.h, color)
+
+    def blit(self, buf, x, y, w, h):
+        """Copy an RGB565 sprite into the back buffer, clipped to it.
+
+        Args:
+            buf (bytes): Sprite pixels.
+            x, y (int): Top left corner relative to the region.
+            w, h (int): Size of the sprite.
+        """
+        clip = self._clip(x, y, w, h)
+        if clip is None:
+            return
+        cx, cy, cw, ch = clip
+        src = memoryview(buf)
+        dst = memoryview(self.back)
+        stride = self.w * 2
+        pos = (cy * self.w + cx) * 2
+        # Skip the sprite rows and columns outside the buffer
+        start = ((cy - y) * w + cx - x) * 2
+        for row in range(start, start + ch * w * 2, w * 2):
+            dst[pos:pos + cw * 2] = src[row:row + cw * 2]
+            pos += stride
+
+    def pixel(self, x, y, color):
+        """Set a pixel of the back buffer, if it is inside."""
+        if 0 <= x < self.w and 0 <= y < self.h:
+            pos = (y * self.w + x) * 2
+            self.back[pos:pos + 2] = color.to_bytes(2, 'big')
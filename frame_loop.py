@@ -0,0 +1,137 @@
+"""Fixed rate frame loop with budget accounting and frame-drop statistics."""
+import time
+from array import array
+from st7789 import ticks_us, ticks_diff
+
+try:
+    sleep_us = time.sleep_us
+except AttributeError:  # CPython
+    def sleep_us(us):
+        time.sleep(us / 1000000)
+
+try:
+    from time import ticks_add
+except ImportError:  # CPython
+    def ticks_add(ticks, delta):
+        return ticks + delta
+
+
+class FrameLoop(object):
+    """Run update and draw callbacks at a target frame rate.
+
+    Update, render and flush phases are timed separately.  When the loop
+    falls more than a frame behind schedule, rendering and flushing are
+    skipped for that frame (counted as dropped) while update still runs.
+
+    Attributes:
+        frames (int): Frames run, including dropped ones.
+        dropped (int): Frames whose render and flush were skipped.
+        overruns (int): Frames whose work exceeded the frame budget.
+    """
+
+    def __init__(self, update, draw, fps=30, flush=None, window=64,
+                 drop_frames=True):
+        """Constructor for FrameLoop object.
+
+        Args:
+            update (function): Called every frame to advance state.
+            draw (function): Called to render the frame.
+            fps (int): Target frames per second (default: 30).
+            flush (function): Optional call sending the frame to the display,
+                e.g. DoubleBuffer.swap (default: None).
+            window (int): Frames kept for rolling stats (default: 64).
+            drop_frames (bool): Skip rendering when behind schedule
+                (default: True).
+        """
+        self.update = update
+        self.draw = draw
+        self.flush = flush
+        self.budget_us = 1000000 // fps
+        self.window = window
+        self.drop_frames = drop_frames
+        self._frame = array('l', [0] * window)
+        self._update = array('l', [0] * window)
+        self._render = array('l', [0] * window)
+        self._flush = array('l', [0] * window)
+        self._deadline = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clear counters and rolling timings."""
+        for a in (self._frame, self._update, self._render, self._flush):
+            for i in range(self.window):
+                a[i] = 0
+        self.frames = 0
+        self.dropped = 0
+        self.overruns = 0
+
+    def step(self):
+        """Run one frame and wait for the next frame slot."""
+        t0 = ticks_us()
+        if self._deadline is None:
+            self._deadline = t0
+        self._deadline = ticks_add(self._deadline, self.budget_us)
+        self.update()
+        t1 = ticks_us()
+        i = self.frames % self.window
+        # Behind by more than a whole frame: skip drawing to catch up
+        if self.drop_frames and ticks_diff(t1, self._deadline) > 0:
+            self.dropped += 1
+            t2 = t3 = t1
+        else:
+            self.draw()
+            t2 = ticks_us()
+            if self.flush is not None:
+                self.flush()
+            t3 = ticks_us()
+        self._update[i] = ticks_diff(t1, t0)
+        self._render[i] = ticks_diff(t2, t1)
+        self._flush[i] = ticks_diff(t3, t2)
+        self._frame[i] = ticks_diff(t3, t0)
+        if self._frame[i] > self.budget_us:
+            self.overruns += 1
+        self.frames += 1
+        wait = ticks_diff(self._deadline, ticks_us())
+        if wait > 0:
+            sleep_us(wait)
+        elif -wait > self.budget_us:
+            # Too far behind to catch up, restart the schedule from now
+            self._deadline = ticks_us()
+
+    def run(self, frames=None):
+        """Run frames until stopped.
+
+        Args:
+            frames (int): Number of frames to run (default: forever).
+        """
+        self._deadline = None
+        if frames is None:
+            while True:
+                self.step()
+        for _ in range(frames):
+            self.step()
+
+    def stats(self):
+        """Return rolling frame statistics in microseconds.
+
+        Returns:
+            dict: frames, dropped, overruns, budget_us, avg_us, p95_us,
+                max_us and average update_us, render_us and flush_us.
+        """
+        n = min(self.frames, self.window)
+        if not n:
+            return {'frames': 0, 'dropped': 0, 'overruns': 0,
+                    'budget_us': self.budget_us}
+        times = sorted(self._frame[:n])
+        return {
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'overruns': self.overruns,
+            'budget_us': self.budget_us,
+            'avg_us': sum(times) // n,
+            'p95_us': times[min(n - 1, n * 95 // 100)],
+            'max_us': times[-1],
+            'update_us': sum(self._update[:n]) // n,
+            'render_us': sum(self._render[:n]) // n,
+            'flush_us': sum(self._flush[:n]) // n,
+        }
@@ -0,0 +1,197 @@
+"""Pre-rendered glyph atlases for fixed color text.
+
+A GlyphAtlas renders every glyph of a font once, in one color pair, into a
+single RGB565 buffer.  Drawing text then only sends slices of that buffer,
+without expanding bits or allocating a buffer per letter.  An atlas can be
+passed to ST7789.draw_text in place of the font, landscape included:
+    hud = GlyphAtlas(XglcdFont('fonts/Unispace12x24.c', 12, 24), 0xFFE0)
+    display.draw_text(0, 0, 'SCORE 120', hud, 0xFFE0)
+
+Atlases take width x height x 2 bytes per glyph, so an AtlasCache keeps
+the ones in use within a memory budget.
+"""
+
+class GlyphAtlas(object):
+    """Glyphs of a font pre-rendered in one color pair.
+
+    Glyph pixels are stored column after column, as XglcdFont.get_letter
+    returns them, so they can be written under a single window.  Glyphs
+    are rendered through the font's codepoints(), measure_text() and
+    get_letter(), so any XglcdFont style font works, sparse ones included.
+
+    Attributes:
+        buf (bytearray): RGB565 pixels of all glyphs.
+        height (int): Pixel height of glyphs.
+        color (int): RGB565 glyph color.
+        background (int): RGB565 background color.
+        size (int): Bytes used by buf.
+    """
+
+    def __init__(self, font, color, background=0, chars=None):
+        """Constructor for GlyphAtlas object.
+
+        Args:
+            font (XglcdFont, PagedFont or dict): Font, e.g. sysfont.sysfont.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+            chars (string): Letters to render (default: the whole font).
+        """
+        self.color = color
+        self.background = background
+        if isinstance(font, dict):
+            self.height = font['Height']
+            start = font['Start']
+            count = len(font['Data']) // font['Width']
+            end = min(font['End'], start + count - 1)
+            codepoints = range(start, end + 1)
+        else:
+            self.height = font.height
+            # Measured and rendered through the font
+            start = None
+            codepoints = font.codepoints()
+        if chars is not None:
+            wanted = set(ord(c) for c in chars)
+            codepoints = [cp for cp in codepoints if cp in wanted]
+        # Offset and width of every glyph packed in one int, by codepoint
+        self._slots = {}
+        # Widths first, so the atlas is allocated once
+        stride = self.height * 2
+        offset = 0
+        for cp in codepoints:
+            if start is None:
+                w = font.measure_text(chr(cp), 0)
+            else:
+                w = font['Width']
+            if w:
+                self._slots[cp] = offset << 8 | w
+                offset += w * stride
+        self.size = offset
+        if background:
+            self.buf = bytearray(background.to_bytes(2, 'big') * (offset // 2))
+        else:
+            self.buf = bytearray(offset)
+        self._mv = memoryview(self.buf)
+        for cp, slot in self._slots.items():
+            w = slot & 0xFF
+            pos = slot >> 8
+            if start is None:
+                letter = font.get_letter(chr(cp), color, background)[0]
+                self._mv[pos:pos + w * stride] = letter
+            else:
+                self._render_columns(font['Data'], (cp - start) * w, w, pos,
+                                     color)
+
+    def _render_columns(self, data, start, w, pos, color):
+        """Expand sysfont style column bytes, bit 0 at the top."""
+        buf = self.buf
+        hi, lo = color.to_bytes(2, 'big')
+        for q in range(w):
+            c = data[start + q]
+            p = pos
+            for _ in range(self.height):
+                if c & 0x01:
+                    buf[p] = hi
+                    buf[p + 1] = lo
+                c >>= 1
+                p += 2
+            pos += self.height * 2
+
+    def get_letter(self, letter, color=None, background=None,
+                   landscape=False):
+        """Return the pixels of a letter as a slice of the atlas.
+
+        Same interface as XglcdFont.get_letter, the colors are ignored.
+        Letters not in the atlas have a width of 0.
+
+        Returns:
+            (memoryview): Pixel data.
+            (int, int): Letter width and height.
+        """
+        slot = self._slots.get(ord(letter))
+        if slot is None:
+            return b'', 0, 0
+        w = slot & 0xFF
+        pos = slot >> 8
+        return self._mv[pos:pos + w * self.height * 2], w, self.height
+
+    def measure_text(self, text, spacing=1):
+        """Measure length of text string in pixels.
+
+        Args:
+            text (string): Text string to measure
+            spacing (optional int): Pixel spacing between letters.  Default: 1.
+        Returns:
+            int: length of text
+        """
+        slots = self._slots
+        length = 0
+        for letter in text:
+            slot = slots.get(ord(letter))
+            if slot is not None:
+                length += (slot & 0xFF) + spacing
+        return length
+
+
+class AtlasCache(object):
+    """Glyph atlases by font and colors within a memory budget.
+
+    When the atlases exceed the budget, the least recently used ones are
+    dropped whole.  The atlas just requested is always kept.
+
+    Attributes:
+        budget (int): Maximum bytes of atlas pixels kept.
+        size (int): Bytes of atlas pixels kept now.
+    """
+
+    def __init__(self, budget=16384):
+        """Constructor for AtlasCache object.
+
+        Args:
+            budget (int): Maximum bytes of atlas pixels (default: 16 KiB).
+        """
+        self.budget = budget
+        self.size = 0
+        self._atlases = {}
+        # Keys, least recently used first
+        self._order = []
+
+    def get(self, font, color, background=0, chars=None):
+        """Return the atlas of a font in a color pair, rendering it if new.
+
+        Args:
+            font (XglcdFont, PagedFont or dict): Font.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+            chars (string): Letters to render (default: the whole font).
+        Returns:
+            GlyphAtlas: Atlas to draw with.
+        """
+        # Dict fonts are not hashable, other fonts are kept alive by the key
+        # so their id cannot be reused
+        key = (id(font) if isinstance(font, dict) else font, color,
+               background, chars)
+        atlas = self._atlases.get(key)
+        if atlas is not None:
+            self._order.remove(key)
+            self._order.append(key)
+            return atlas
+        atlas = GlyphAtlas(font, color, background, chars)
+        self._atlases[key] = atlas
+        self._order.append(key)
+        self.size += atlas.size
+        while self.size > self.budget and len(self._order) > 1:
+            self.size -= self._atlases.pop(self._order.pop(0)).size
+        return atlas
+
+    def draw_text(self, display, x, y, text, font, color, background=0,
+                  landscape=False, spacing=1):
+        """Draw text like ST7789.draw_text through the atlas of the font."""
+        atlas = self.get(font, color, background)
+        display.draw_text(x, y, text, atlas, color, background, landscape,
+                          spacing)
+
+    def clear(self):
+        """Drop all atlases."""
+        self._atlases = {}
+        self._order = []
+        self.size = 0
@@ -0,0 +1,146 @@
+"""Cache of fully rendered text labels.
+
+Menus and headers draw the same strings in the same font and colors over
+and over.  With a LabelCache passed to ST7789.draw_text or ST7789.text, a
+label is rendered into one buffer the first time and later draws send that
+buffer under a single window, without touching the font:
+    labels = LabelCache(budget=8192)
+    display.draw_text(0, 0, 'Settings', font, 0xFFFF, cache=labels)
+
+Labels are stored column after column, the order draw_text writes letters
+in, so one buffer serves portrait and landscape text.
+"""
+
+
+def _render_font(text, font, color, background, spacing):
+    """Render text of an XglcdFont style font (get_letter, measure_text)."""
+    width = font.measure_text(text, spacing)
+    stride = font.height * 2
+    if background:
+        buf = bytearray(background.to_bytes(2, 'big') * (width * font.height))
+    else:
+        buf = bytearray(width * stride)
+    mv = memoryview(buf)
+    pos = 0
+    for letter in text:
+        data, w, _ = font.get_letter(letter, color, background)
+        if not w:
+            continue
+        mv[pos:pos + w * stride] = data
+        # Spacing columns keep the background
+        pos += (w + spacing) * stride
+    return buf, width
+
+
+def _render_sysfont(text, font, color, spacing):
+    """Render text of a sysfont dict, one bit per pixel with bit 0 on top."""
+    fontw = font['Width']
+    fonth = font['Height']
+    start = font['Start']
+    end = min(font['End'], start + len(font['Data']) // fontw - 1)
+    data = font['Data']
+    width = len(text) * (fontw + spacing)
+    hi, lo = color.to_bytes(2, 'big')
+    buf = bytearray(width * fonth * 2)
+    pos = 0
+    for letter in text:
+        ci = ord(letter)
+        if start <= ci <= end:
+            ci = (ci - start) * fontw
+            for c in data[ci:ci + fontw]:
+                p = pos
+                for _ in range(fonth):
+                    if c & 0x01:
+                        buf[p] = hi
+                        buf[p + 1] = lo
+                    c >>= 1
+                    p += 2
+                pos += fonth * 2
+            pos += spacing * fonth * 2
+        else:
+            pos += (fontw + spacing) * fonth * 2
+    return buf, width
+
+
+class LabelCache(object):
+    """Rendered labels by text, font, colors and spacing.
+
+    When the labels exceed the byte budget, the least recently used ones
+    are dropped.  The label just requested is always kept.
+
+    Attributes:
+        budget (int): Maximum bytes of label pixels kept.
+        size (int): Bytes of label pixels kept now.
+        hits (int): Labels served from the cache.
+        misses (int): Labels rendered.
+    """
+
+    def __init__(self, budget=8192):
+        """Constructor for LabelCache object.
+
+        Args:
+            budget (int): Maximum bytes of label pixels (default: 8 KiB).
+        """
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._labels = {}
+        # Keys, least recently used first
+        self._order = []
+
+    def label(self, text, font, color, background=0, spacing=1):
+        """Return a rendered label, rendering it if new.
+
+        Args:
+            text (string): Text of the label.
+            font (XglcdFont or dict): Font, a sysfont dict is drawn like
+                ST7789.text at size 1.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+            spacing (int): Pixels between letters (default: 1)
+        Returns:
+            (bytearray, int): Column ordered pixels and width of the label.
+        """
+        # Dict fonts are not hashable, other fonts are kept alive by the key
+        # so their id cannot be reused
+        key = (text, id(font) if isinstance(font, dict) else font, color,
+               background, spacing)
+        label = self._labels.get(key)
+        if label is not None:
+            self.hits += 1
+            if self._order[-1] != key:
+                self._order.remove(key)
+                self._order.append(key)
+            return label
+        self.misses += 1
+        if isinstance(font, dict):
+            label = _render_sysfont(text, font, color, spacing)
+        else:
+            label = _render_font(text, font, color, background, spacing)
+        self._labels[key] = label
+        self._order.append(key)
+        self.size += len(label[0])
+        while self.size > self.budget and len(self._order) > 1:
+            self.size -= len(self._labels.pop(self._order.pop(0))[0])
+        return label
+
+    def invalidate(self, text=None, font=None):
+        """Drop cached labels, e.g. after changing a font.
+
+        Args:
+            text (string): Only drop labels of this text (default: any).
+            font (XglcdFont or dict): Only drop labels of this font
+                (default: any).
+        """
+        for key in self._order[:]:
+            if ((text is None or key[0] == text) and
+                    (font is None or key[1] is font or key[1] == id(font))):
+                self.size -= len(self._labels.pop(key)[0])
+                self._order.remove(key)
+
+    def clear(self):
+        """Drop all labels."""
+        self._labels = {}
+        self._order = []
+        self.size = 0
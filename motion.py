@@ -0,0 +1,152 @@
+"""Redraw moving objects by restoring only the area they uncover.
+
+When an object moves, the part of its old rectangle not covered by the new
+one is restored from the background and the object is drawn at its new
+place.  For small steps that is a thin L-shaped edge instead of the whole
+object:
+    updater = MotionUpdater(display, background=0)
+    updater.move(sprite, x, y, w, h, sprite.draw)
+    updater.flush()
+"""
+from array import array
+
+from st7789 import Color
+
+
+def exposed_rects(old, new):
+    """Return the parts of the old rectangle not covered by the new one.
+
+    Args:
+        old, new (tuple): x, y, w, h of the rectangles.
+    Returns:
+        list: Up to four disjoint (x, y, w, h) rectangles; two at most for
+            a move of a rectangle of unchanged size.
+    """
+    ox, oy, ow, oh = old
+    nx, ny, nw, nh = new
+    ox1 = ox + ow
+    oy1 = oy + oh
+    nx1 = nx + nw
+    ny1 = ny + nh
+    if nx >= ox1 or nx1 <= ox or ny >= oy1 or ny1 <= oy:
+        return [old] if ow > 0 and oh > 0 else []
+    rects = []
+    # Full width bands above and below the overlap
+    if ny > oy:
+        rects.append((ox, oy, ow, ny - oy))
+    if ny1 < oy1:
+        rects.append((ox, ny1, ow, oy1 - ny1))
+    # Strips left and right of the overlap, between the bands
+    top = max(oy, ny)
+    h = min(oy1, ny1) - top
+    if nx > ox:
+        rects.append((ox, top, nx - ox, h))
+    if nx1 < ox1:
+        rects.append((nx1, top, ox1 - nx1, h))
+    return rects
+
+
+def _overlaps(a, b):
+    return (a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and
+            a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+
+class MotionUpdater(object):
+    """Track moving objects and redraw only what their motion exposes.
+
+    Moves are queued with move() and sent by flush(): exposed areas of all
+    objects are restored first, then every object that moved, or that
+    overlaps a restored area, is drawn.  Exposed areas are computed from
+    the last drawn position, so frames may be skipped.
+
+    Attributes:
+        restored (int): Pixels restored by the last flush().
+    """
+
+    def __init__(self, display, background=0):
+        """Constructor for MotionUpdater object.
+
+        Args:
+            display (ST7789): Display object.
+            background: What lies behind the objects: an RGB565 color, the
+                path of a full screen raw image or a full screen RGB565
+                buffer (default: black).
+        """
+        self.display = display
+        self.background = background
+        self.restored = 0
+        # Last drawn rectangle and draw function of every object, and the
+        # objects in drawing order
+        self._drawn = {}
+        self._keys = []
+        self._moves = []
+
+    def move(self, key, x, y, w, h, draw):
+        """Queue an object for drawing at a new position.
+
+        Args:
+            key: Object identity, e.g. the sprite itself.
+            x, y (int): New top left corner.
+            w, h (int): Size of the object.
+            draw (function): Called with x, y to draw the object.
+        """
+        self._moves.append((key, (x, y, w, h), draw))
+
+    def remove(self, key):
+        """Queue restoring the background under an object."""
+        self._moves.append((key, None, None))
+
+    def flush(self):
+        """Restore exposed areas and draw the queued objects."""
+        drawn = self._drawn
+        exposed = []
+        moved = set()
+        for key, rect, draw in self._moves:
+            old = drawn.get(key)
+            if old is not None:
+                if rect == old[0]:
+                    # Not moved: nothing to restore or draw
+                    drawn[key] = (rect, draw)
+                    continue
+                if rect is None:
+                    exposed.append(old[0])
+                    del drawn[key]
+                    self._keys.remove(key)
+                    continue
+                exposed.extend(exposed_rects(old[0], rect))
+            elif rect is not None:
+                self._keys.append(key)
+            if rect is not None:
+                drawn[key] = (rect, draw)
+                moved.add(key)
+        self._moves = []
+        self._restore(exposed)
+        # Objects restored over must be drawn again too
+        for key in self._keys:
+            rect, draw = drawn[key]
+            if key in moved or any(_overlaps(rect, r) for r in exposed):
+                draw(rect[0], rect[1])
+
+    def _restore(self, rects):
+        self.restored = sum(r[2] * r[3] for r in rects)
+        if not rects:
+            return
+        display = self.display
+        background = self.background
+        if isinstance(background, (int, Color)):
+            batch = array('h')
+            for r in rects:
+                batch.extend(r)
+            display.fill_rects(batch, background)
+            return
+        for x, y, w, h in rects:
+            # Drawing the full screen background clipped to the rectangle
+            # sends only the rectangle
+            display.push_clip(x, y, w, h, translate=False)
+            if type(background) == type(''):
+                display.draw_image(background, 0, 0, display.width,
+                                   display.height)
+            else:
+                display.blit_buffer(background, 0, 0, display.width,
+                                    display.height)
+            display.pop_clip()
@@ -0,0 +1,185 @@
+"""NumPy frame memory for fast host-side rendering (CPython, not MicroPython).
+
+NumpyTransport models the ST7789 like transport.MockTransport, but keeps
+frame memory in a uint16 array and writes every RAMWR burst with one
+vectorized assignment.  Drawing code runs unchanged, so frames are pixel
+identical to what the driver sends the panel:
+    fb = NumpyTransport()
+    display = ST7789(None, 135, 240, None, None, None, transport=fb)
+    display.fill_gradient_h(0, 0, 135, 240, 0xF800, 0x001F)
+    fb.save('gradient.png', 52, 40, 135, 240)
+
+PNG and PPM snapshots are written without any imaging library.
+"""
+import struct
+import zlib
+
+import numpy as np
+
+from spi_trace import Replayer
+
+_GRAM_WIDTH = 240
+_GRAM_HEIGHT = 320
+
+_RAMRD = 0x2E
+_MADCTL_MY = 0x80
+_MADCTL_MX = 0x40
+_MADCTL_MV = 0x20
+
+
+def rgb888(values):
+    """Expand RGB565 values to RGB888 by bit replication.
+
+    Args:
+        values (numpy.ndarray): uint16 RGB565 values.
+    Returns:
+        numpy.ndarray: uint8 array of shape values.shape + (3,).
+    """
+    values = values.astype(np.uint16)
+    r = (values >> 11) & 0x1F
+    g = (values >> 5) & 0x3F
+    b = values & 0x1F
+    rgb = np.empty(values.shape + (3,), dtype=np.uint8)
+    rgb[..., 0] = (r << 3) | (r >> 2)
+    rgb[..., 1] = (g << 2) | (g >> 4)
+    rgb[..., 2] = (b << 3) | (b >> 2)
+    return rgb
+
+
+class NumpyTransport(Replayer):
+    """Controller model with frame memory in a NumPy array.
+
+    Attributes:
+        gram (numpy.ndarray): 320x240 uint16 RGB565 frame memory, indexed
+            [row, column].
+        Other counters as spi_trace.Replayer.
+    """
+
+    def __init__(self):
+        Replayer.__init__(self)
+        self.gram = np.zeros((_GRAM_HEIGHT, _GRAM_WIDTH), dtype=np.uint16)
+
+    def data(self, data):
+        if type(data) == int:
+            data = bytes([data])
+        Replayer.data(self, data)
+
+    def flush(self):
+        pass
+
+    def deinit(self):
+        pass
+
+    def _write_pixels(self, data):
+        if self._half is not None:
+            data = bytes([self._half]) + bytes(data)
+            self._half = None
+        n = len(data) // 2
+        if len(data) & 1:
+            self._half = data[-1]
+        if not n:
+            return
+        values = np.frombuffer(data, dtype='>u2', count=n)
+        c0, c1 = self._columns
+        r0, r1 = self._rows
+        cols = max(c1 - c0 + 1, 1)
+        size = cols * max(r1 - r0 + 1, 1)
+        start = (self._row - r0) * cols + self._col - c0
+        end = start + n
+        self._col = c0 + end % cols
+        self._row = r0 + end // cols % (size // cols)
+        self.pixels += n
+        if n > size:
+            # The address counter wrapped, only the last pass is visible
+            start += n - size
+            values = values[n - size:]
+            n = size
+        row, col, inside = self._locate(start, n)
+        if not inside.all():
+            values = values[inside]
+        self.gram[row, col] = values
+
+    def _locate(self, start, n):
+        """Map n address counter steps from start to frame memory.
+
+        Returns:
+            (numpy.ndarray, numpy.ndarray, numpy.ndarray): Rows and columns
+                of the steps inside frame memory, and the mask of steps
+                that are inside.
+        """
+        c0, c1 = self._columns
+        r0, r1 = self._rows
+        cols = max(c1 - c0 + 1, 1)
+        size = cols * max(r1 - r0 + 1, 1)
+        k = (start + np.arange(n)) % size
+        col = c0 + k % cols
+        row = r0 + k // cols
+        madctl = self._madctl
+        if madctl & _MADCTL_MV:
+            col, row = row, col
+        if madctl & _MADCTL_MX:
+            col = _GRAM_WIDTH - 1 - col
+        if madctl & _MADCTL_MY:
+            row = _GRAM_HEIGHT - 1 - row
+        inside = ((col >= 0) & (col < _GRAM_WIDTH) &
+                  (row >= 0) & (row < _GRAM_HEIGHT))
+        return row[inside], col[inside], inside
+
+    def readinto(self, command, buf):
+        """Answer RAMRD from frame memory in the 18-bit read format."""
+        self.command(command)
+        out = np.frombuffer(buf, dtype=np.uint8)
+        out[:] = 0
+        n = (len(out) - 1) // 3
+        if command != _RAMRD or not n:
+            return
+        row, col, inside = self._locate(0, n)
+        rgb = np.zeros((n, 3), dtype=np.uint8)
+        rgb[inside] = rgb888(self.gram[row, col]) & 0xFC
+        out[1:1 + n * 3] = rgb.reshape(-1)
+
+    def array(self, x=0, y=0, w=_GRAM_WIDTH, h=_GRAM_HEIGHT):
+        """Return a view of a region of frame memory.
+
+        Args:
+            x, y (int): Top left corner in GRAM, e.g. 52, 40 for the
+                135x240 panel (default: 0, 0).
+            w, h (int): Size of the region (default: whole GRAM).
+        """
+        return self.gram[y:y + h, x:x + w]
+
+    def frame(self, x=0, y=0, w=_GRAM_WIDTH, h=_GRAM_HEIGHT):
+        """Return a region of frame memory as big-endian RGB565 bytes."""
+        return self.array(x, y, w, h).astype('>u2').tobytes()
+
+    def save(self, path, x=0, y=0, w=_GRAM_WIDTH, h=_GRAM_HEIGHT):
+        """Write a region of frame memory as a .png or .ppm image.
+
+        Args:
+            path (string): Output file, the format follows the extension.
+            x, y, w, h (int): Region as for array() (default: whole GRAM).
+        """
+        rgb = rgb888(self.array(x, y, w, h))
+        if path.lower().endswith('.ppm'):
+            data = b'P6\n%d %d\n255\n' % (w, h) + rgb.tobytes()
+        else:
+            data = _png(rgb)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
+def _png(rgb):
+    """Encode an RGB888 array as a PNG file."""
+    h, w = rgb.shape[:2]
+    # Filter type 0 (none) in front of every row
+    rows = np.zeros((h, w * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = rgb.reshape(h, w * 3)
+
+    def chunk(kind, body):
+        return (struct.pack('>I', len(body)) + kind + body +
+                struct.pack('>I', zlib.crc32(kind + body) & 0xFFFFFFFF))
+
+    header = struct.pack('>IIBBBBB', w, h, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) +
+            chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)) +
+            chunk(b'IEND', b''))
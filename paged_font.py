@@ -0,0 +1,198 @@
+"""X-GLCD fonts with sparse codepoints, loaded from file a page at a time.
+
+A paged font file holds glyphs of any Unicode BMP codepoints, e.g. ASCII,
+Latin-1 and box drawing characters, in X-GLCD letter format behind a sorted
+codepoint index.  Only the index is kept in RAM; glyph data is read in
+pages of a few letters when drawn and the least recently used pages are
+dropped:
+    font = PagedFont('Unispace12x24.pgf')
+    display.draw_text(0, 0, 'Grüße ─ 25°C', font, 0xFFFF)
+
+Files are made from X-GLCD fonts of one height on the host or on the
+board.  Only ASCII fonts ship in fonts/; other sets, e.g. Latin-1 letters
+exported from GLCD Font Creator to latin1.c, are given with their first
+codepoint:
+    write_paged_font('Unispace12x24.pgf', [
+        XglcdFont('fonts/Unispace12x24.c', 12, 24),
+        XglcdFont('latin1.c', 12, 24, 0xA0, 96)])
+or from the command line:
+    python paged_font.py out.pgf 24 fonts/Unispace12x24.c:12 latin1.c:12:0xA0
+
+File layout (little-endian):
+    header   magic b'XGPF', width, height, page size (B), bytes per letter,
+             letter count (H)
+    index    letter count codepoints (H), sorted
+    letters  letter count X-GLCD letters of bytes per letter each
+"""
+from array import array
+from math import floor
+
+try:
+    import ustruct as struct
+except ImportError:
+    import struct
+
+from xglcd_font import XglcdFont
+
+_MAGIC = b'XGPF'
+_HEADER = '<4sBBBHH'
+
+
+class PagedFont(XglcdFont):
+    """X-GLCD font read from a paged font file on demand.
+
+    Letters are looked up by codepoint, so start_letter and letters of
+    XglcdFont do not apply; codepoints() lists the letters instead.
+
+    Attributes:
+        width: Maximum pixel width of font
+        height: Pixel height of font
+        letter_count: Number of letters in the file
+        page_size: Letters read from file at once
+        height_bytes: How many bytes comprises letter height
+    """
+
+    def __init__(self, path, pages=4):
+        """Constructor for PagedFont object.
+
+        Args:
+            path (string): Full path of paged font file.
+            pages (int): Pages kept in RAM (default: 4).
+        """
+        self._file = open(path, 'rb')
+        header = self._file.read(struct.calcsize(_HEADER))
+        (magic, self.width, self.height, self.page_size,
+         self.bytes_per_letter, self.letter_count) = struct.unpack(
+             _HEADER, header)
+        if magic != _MAGIC:
+            raise ValueError('Not a paged font file: ' + path)
+        self.height_bytes = floor((self.height - 1) / 8) + 1
+        self._index = array('H', bytes(2 * self.letter_count))
+        self._file.readinto(self._index)
+        self._data_offset = len(header) + 2 * self.letter_count
+        self.pages = pages
+        self._pages = {}
+        # Page numbers, least recently used first
+        self._order = []
+
+    def _find(self, codepoint):
+        """Return the position of a codepoint in the index, or -1."""
+        index = self._index
+        lo = 0
+        hi = len(index)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if index[mid] < codepoint:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(index) and index[lo] == codepoint:
+            return lo
+        return -1
+
+    def _page(self, page):
+        """Return the letter data of a page, reading it if needed."""
+        buf = self._pages.get(page)
+        if buf is not None:
+            if self._order[-1] != page:
+                self._order.remove(page)
+                self._order.append(page)
+            return buf
+        first = page * self.page_size
+        count = min(self.page_size, self.letter_count - first)
+        buf = bytearray(count * self.bytes_per_letter)
+        self._file.seek(self._data_offset + first * self.bytes_per_letter)
+        self._file.readinto(buf)
+        if len(self._order) >= self.pages:
+            del self._pages[self._order.pop(0)]
+        self._pages[page] = buf
+        self._order.append(page)
+        return buf
+
+    def _glyph(self, letter):
+        i = self._find(ord(letter))
+        if i < 0:
+            return None
+        page, i = divmod(i, self.page_size)
+        offset = i * self.bytes_per_letter
+        return memoryview(self._page(page))[
+            offset:offset + self.bytes_per_letter]
+
+    def codepoints(self):
+        """Return the codepoints of all letters in the file, sorted."""
+        return self._index
+
+    def __contains__(self, letter):
+        return self._find(ord(letter)) >= 0
+
+    def close(self):
+        """Close the font file."""
+        self._file.close()
+        self._pages = {}
+        self._order = []
+
+
+def write_paged_font(path, fonts, page_size=16):
+    """Write X-GLCD fonts of the same height to a paged font file.
+
+    Args:
+        path (string): Output file.
+        fonts (list): XglcdFont objects; letter n of a font is codepoint
+            start_letter + n.  The first font containing a codepoint wins.
+        page_size (int): Letters read from file at once, 1-255 (default: 16).
+    Returns:
+        int: Number of letters written.
+    """
+    height = fonts[0].height
+    width = 0
+    letters = {}
+    for font in fonts:
+        if font.height != height:
+            raise ValueError('Fonts must have the same height.')
+        width = max(width, font.width)
+        for n in range(font.letter_count):
+            codepoint = font.start_letter + n
+            if codepoint > 0xFFFF:
+                raise ValueError('Codepoint outside the BMP: ' +
+                                 hex(codepoint))
+            offset = n * font.bytes_per_letter
+            letter = font.letters[offset:offset + font.bytes_per_letter]
+            # Empty slots of the source font are left out
+            if letter[0] and codepoint not in letters:
+                letters[codepoint] = letter
+    bytes_per_letter = (floor((height - 1) / 8) + 1) * width + 1
+    codepoints = sorted(letters)
+    with open(path, 'wb') as f:
+        f.write(struct.pack(_HEADER, _MAGIC, width, height, page_size,
+                            bytes_per_letter, len(codepoints)))
+        f.write(struct.pack('<%dH' % len(codepoints), *codepoints))
+        for codepoint in codepoints:
+            letter = letters[codepoint]
+            # Narrower fonts are padded with empty columns
+            f.write(letter)
+            f.write(bytes(bytes_per_letter - len(letter)))
+    return len(codepoints)
+
+
+def main():
+    """Convert X-GLCD 'C' font files given as path:width[:start[:count]]."""
+    import argparse
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('output', help='paged font file to write')
+    parser.add_argument('height', type=int, help='letter height in pixels')
+    parser.add_argument('fonts', nargs='+',
+                        help='X-GLCD font as path:width[:start[:count]]')
+    parser.add_argument('--page-size', type=int, default=16,
+                        help='letters per page (default: 16)')
+    args = parser.parse_args()
+    fonts = []
+    for spec in args.fonts:
+        parts = spec.split(':')
+        numbers = [int(p, 0) for p in parts[1:]]
+        fonts.append(XglcdFont(parts[0], numbers[0], args.height, *numbers[1:]))
+    count = write_paged_font(args.output, fonts, args.page_size)
+    print('{0}: {1} letters'.format(args.output, count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+"""Host-side RGB565 asset converter (CPython + NumPy, not for MicroPython).
+
+Converts RGB888 arrays and image files to the big-endian RGB565 .raw format
+read by ST7789.draw_image and ST7789.load_sprite.  Reading image files needs
+Pillow.
+
+Usage:
+    python rgb565_convert.py images_src/Tabby.png
+    python rgb565_convert.py --dither fs --out images images_src/
+    python rgb565_convert.py --benchmark
+"""
+import argparse
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+# 4x4 Bayer threshold matrix (values 0-15)
+BAYER4 = np.array([[0, 8, 2, 10],
+                   [12, 4, 14, 6],
+                   [3, 11, 1, 9],
+                   [15, 7, 13, 5]], dtype=np.uint16)
+
+# Bits dropped from each 8 bit channel: red 3, green 2, blue 3
+_STEPS = np.array([8, 4, 8], dtype=np.uint16)
+_MASKS = np.array([0xF8, 0xFC, 0xF8], dtype=np.uint8)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.ppm')
+
+
+def color565(rgb):
+    """Convert RGB888 values to RGB565, same as st7789.color565.
+
+    Args:
+        rgb (array_like): uint8 array with red, green and blue in the last
+            axis, e.g. shape (h, w, 3).
+    Returns:
+        numpy.ndarray: uint16 RGB565 values of shape rgb.shape[:-1].
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    r = rgb[..., 0].astype(np.uint16)
+    g = rgb[..., 1].astype(np.uint16)
+    b = rgb[..., 2].astype(np.uint16)
+    return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+
+def to_bytes(rgb565):
+    """Return RGB565 values as big-endian bytes in ST7789 pixel order."""
+    return np.asarray(rgb565, dtype=np.uint16).astype('>u2').tobytes()
+
+
+def dither_ordered(rgb):
+    """Apply 4x4 Bayer ordered dithering ahead of RGB565 truncation.
+
+    Args:
+        rgb (array_like): uint8 array of shape (h, w, 3).
+    Returns:
+        numpy.ndarray: Dithered uint8 array of the same shape.
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    h, w = rgb.shape[:2]
+    threshold = np.tile(BAYER4, ((h + 3) // 4, (w + 3) // 4))[:h, :w]
+    # Offset in [0, step) so truncation rounds up at the Bayer density
+    offset = (threshold[..., None] * _STEPS) >> 4
+    return np.minimum(rgb + offset, 255).astype(np.uint8)
+
+
+def dither_floyd_steinberg(rgb):
+    """Apply Floyd-Steinberg error diffusion ahead of RGB565 truncation.
+
+    The error passed to the right depends on the pixel before, so each row
+    is walked per channel on plain Python floats; the error carried into
+    the next row is then added for the whole row at once.
+
+    Args:
+        rgb (array_like): uint8 array of shape (h, w, 3).
+    Returns:
+        numpy.ndarray: Dithered uint8 array of the same shape.
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    h, w = rgb.shape[:2]
+    out = np.empty((h, w, 3), dtype=np.uint8)
+    masks = _MASKS.tolist()
+    errors = np.empty((w, 3))
+    carry = np.zeros((w, 3))
+    for y in range(h):
+        row = (rgb[y] + carry).T.tolist()
+        for c in range(3):
+            mask = masks[c]
+            values = row[c]
+            new = [0] * w
+            err = 0.0
+            for x in range(w):
+                old = values[x] + err * (7 / 16)
+                old = 0.0 if old < 0 else 255.0 if old > 255 else old
+                n = int(old) & mask
+                new[x] = n
+                err = old - n
+                values[x] = err
+            out[y, :, c] = new
+            errors[:, c] = values
+        # 3/16 below left, 5/16 below and 1/16 below right
+        carry = errors * (5 / 16)
+        carry[:-1] += errors[1:] * (3 / 16)
+        carry[1:] += errors[:-1] * (1 / 16)
+    return out
+
+
+_DITHERS = {
+    None: None,
+    'ordered': dither_ordered,
+    'fs': dither_floyd_steinberg,
+}
+
+
+def convert_array(rgb, dither=None):
+    """Convert an RGB888 image array to big-endian RGB565 bytes.
+
+    Args:
+        rgb (array_like): uint8 array of shape (h, w, 3).
+        dither (string): None, 'ordered' or 'fs' (default: None).
+    Returns:
+        bytes: Pixel data for ST7789.draw_image.
+    """
+    if dither not in _DITHERS:
+        raise ValueError('Unknown dither: {0}'.format(dither))
+    if dither:
+        rgb = _DITHERS[dither](rgb)
+    return to_bytes(color565(rgb))
+
+
+def load_image(path):
+    """Load an image file as an RGB888 array (requires Pillow)."""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError('Pillow is required to read image files')
+    with Image.open(path) as img:
+        return np.asarray(img.convert('RGB'))
+
+
+def convert_file(src, dst=None, dither=None):
+    """Convert an image file to a .raw asset.
+
+    Args:
+        src (string): Source image path.
+        dst (string): Output path or directory.  Default is the source
+            directory with the repo naming scheme, e.g. Tabby128x128.raw.
+        dither (string): None, 'ordered' or 'fs' (default: None).
+    Returns:
+        string: Path of the written .raw file.
+    """
+    rgb = load_image(src)
+    h, w = rgb.shape[:2]
+    if dst is None or os.path.isdir(dst):
+        name = '{0}{1}x{2}.raw'.format(
+            os.path.splitext(os.path.basename(src))[0], w, h)
+        dst = os.path.join(dst if dst else os.path.dirname(src), name)
+    with open(dst, 'wb') as f:
+        f.write(convert_array(rgb, dither))
+    return dst
+
+
+def _convert_job(job):
+    return convert_file(*job)
+
+
+def convert_folder(src_dir, dst_dir=None, dither=None, processes=None):
+    """Convert every image in a folder using a process pool.
+
+    Args:
+        src_dir (string): Folder with source images.
+        dst_dir (string): Output folder (default: src_dir).
+        dither (string): None, 'ordered' or 'fs' (default: None).
+        processes (int): Worker count (default: os.cpu_count()).
+    Returns:
+        list: Paths of the written .raw files.
+    """
+    dst_dir = dst_dir or src_dir
+    if not os.path.isdir(dst_dir):
+        os.makedirs(dst_dir)
+    jobs = [(os.path.join(src_dir, name), dst_dir, dither)
+            for name in sorted(os.listdir(src_dir))
+            if name.lower().endswith(IMAGE_EXTENSIONS)]
+    if processes == 1 or len(jobs) < 2:
+        return [_convert_job(job) for job in jobs]
+    with Pool(processes) as pool:
+        return pool.map(_convert_job, jobs)
+
+
+def check_exact():
+    """Verify bit-exactness with st7789.color565.
+
+    color565 treats the channels independently, so every value of each
+    channel is checked against the driver implementation.
+    """
+    from st7789 import color565 as reference
+    levels = np.arange(256, dtype=np.uint8)
+    zeros = np.zeros(256, dtype=np.uint8)
+    for channel in range(3):
+        rgb = np.stack([levels if c == channel else zeros
+                        for c in range(3)], axis=-1)
+        expected = [reference(*(int(v) for v in px)) for px in rgb]
+        if color565(rgb).tolist() != expected:
+            return False
+    return True
+
+
+def benchmark(pixels=1 << 20, repeat=3):
+    """Time NumPy conversion against st7789.color565 on random pixels.
+
+    Args:
+        pixels (int): Number of pixels to convert (default: 1M).
+        repeat (int): Best-of repetitions (default: 3).
+    Returns:
+        dict: Megapixels per second for both paths and the speedup.
+    """
+    from st7789 import color565 as reference
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, size=(pixels, 3), dtype=np.uint8)
+    vector = min(_timed(lambda: to_bytes(color565(rgb)))
+                 for _ in range(repeat))
+    # The scalar path is slow, so it is timed on a slice and scaled up
+    sample = rgb[:min(pixels, 1 << 16)].tolist()
+    scalar = min(_timed(lambda: [reference(r, g, b) for r, g, b in sample])
+                 for _ in range(repeat)) * pixels / len(sample)
+    return {
+        'pixels': pixels,
+        'numpy_mpix_s': pixels / vector / 1e6,
+        'scalar_mpix_s': pixels / scalar / 1e6,
+        'speedup': scalar / vector,
+    }
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Convert images to big-endian RGB565 .raw files.')
+    parser.add_argument('paths', nargs='*', help='image files or folders')
+    parser.add_argument('--out', help='output file or folder')
+    parser.add_argument('--dither', choices=('ordered', 'fs'))
+    parser.add_argument('--processes', type=int,
+                        help='worker processes for folders')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='check bit-exactness and time conversion')
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        print('bit-exact with st7789.color565: {0}'.format(check_exact()))
+        result = benchmark()
+        print('{pixels} pixels: numpy {numpy_mpix_s:.1f} Mpix/s, '
+              'scalar {scalar_mpix_s:.2f} Mpix/s, '
+              'speedup {speedup:.0f}x'.format(**result))
+    for path in args.paths:
+        if os.path.isdir(path):
+            for dst in convert_folder(path, args.out, args.dither,
+                                      args.processes):
+                print(dst)
+        else:
+            print(convert_file(path, args.out, args.dither))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,363 @@
+"""SPI traffic capture and replay for ST7789 regression tests.
+
+Recorder wraps the SPI bus and the DC/CS pins handed to ST7789 and logs
+every command byte, data payload and chip select to a compact binary trace.
+Replayer rebuilds the controller frame memory from a trace and counts the
+transfer cost, so two traces can be compared by final frame and bytes sent.
+
+Recording runs on the board or on CPython without any hardware:
+    with open('fill.trace', 'wb') as f:
+        rec = Recorder(f)
+        display = ST7789(rec.spi, 135, 240, cs=rec.cs, dc=rec.dc, rst=None)
+        display.fill(0)
+
+Comparing traces on the host:
+    python spi_trace.py before.trace after.trace
+"""
+MAGIC = b'ST7TRC01'
+
+# Record types; data records carry a varint length and the payload
+REC_COMMAND = 0x01
+REC_DATA = 0x02
+REC_SELECT = 0x03
+
+_GRAM_WIDTH = 240
+_GRAM_HEIGHT = 320
+
+_CASET = 0x2A
+_RASET = 0x2B
+_RAMWR = 0x2C
+_MADCTL = 0x36
+_MADCTL_MY = 0x80
+_MADCTL_MX = 0x40
+_MADCTL_MV = 0x20
+
+
+class TracePin(object):
+    """Pin wrapper reporting level changes to a Recorder."""
+
+    OUT = 1
+    IN = 0
+
+    def __init__(self, recorder, name, pin=None):
+        self._recorder = recorder
+        self._name = name
+        self._pin = pin
+        self._value = 1
+
+    def init(self, mode=-1, value=None):
+        if self._pin is not None:
+            if value is None:
+                self._pin.init(mode)
+            else:
+                self._pin.init(mode, value=value)
+        if value is not None:
+            self._set(value)
+
+    def _set(self, value):
+        value = 1 if value else 0
+        if value != self._value:
+            self._value = value
+            self._recorder._pin_changed(self._name, value)
+        if self._pin is not None:
+            self._pin.value(value)
+
+    def on(self):
+        self._set(1)
+
+    def off(self):
+        self._set(0)
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self._set(value)
+
+    __call__ = value
+
+
+class TraceSPI(object):
+    """SPI wrapper logging writes to a Recorder."""
+
+    def __init__(self, recorder, spi=None):
+        self._recorder = recorder
+        self._spi = spi
+
+    def write(self, buf):
+        self._recorder._write(buf)
+        if self._spi is not None:
+            self._spi.write(buf)
+
+    def read(self, nbytes, write=0x00):
+        return self._spi.read(nbytes, write)
+
+    def readinto(self, buf, write=0x00):
+        return self._spi.readinto(buf, write)
+
+    def deinit(self):
+        if self._spi is not None:
+            self._spi.deinit()
+
+
+class Recorder(object):
+    """Capture ST7789 bus traffic to a binary trace.
+
+    Attributes:
+        spi (TraceSPI): Bus to pass to ST7789.
+        dc (TracePin): Data/command pin to pass to ST7789.
+        cs (TracePin): Chip select pin to pass to ST7789.
+    """
+
+    def __init__(self, stream, spi=None, dc=None, cs=None):
+        """Constructor for Recorder object.
+
+        Args:
+            stream: Binary file-like object the trace is written to.
+            spi (SPI): Real bus to forward writes to (default: None).
+            dc (Pin): Real data/command pin (default: None).
+            cs (Pin): Real chip select pin (default: None).
+        """
+        self._stream = stream
+        self.spi = TraceSPI(self, spi)
+        self.dc = TracePin(self, 'dc', dc)
+        self.cs = TracePin(self, 'cs', cs)
+        stream.write(MAGIC)
+
+    def _pin_changed(self, name, value):
+        if name == 'cs' and not value:
+            self._stream.write(bytes([REC_SELECT]))
+
+    def _write(self, buf):
+        stream = self._stream
+        if self.dc._value:
+            n = len(buf)
+            head = bytearray([REC_DATA])
+            while n > 0x7F:
+                head.append(n & 0x7F | 0x80)
+                n >>= 7
+            head.append(n)
+            stream.write(head)
+            stream.write(buf)
+        else:
+            for c in bytes(buf):
+                stream.write(bytes([REC_COMMAND, c]))
+
+    def close(self):
+        self._stream.close()
+
+
+class Replayer(object):
+    """Rebuild ST7789 frame memory from a trace and count transfer costs.
+
+    Attributes:
+        gram (bytearray): 240x320 big-endian RGB565 frame memory.
+        commands (int): Command bytes sent.
+        data_bytes (int): Data bytes sent.
+        writes (int): SPI data writes.
+        transactions (int): Chip select assertions.
+        pixels (int): Pixels written to frame memory.
+    """
+
+    def __init__(self):
+        self.gram = bytearray(_GRAM_WIDTH * _GRAM_HEIGHT * 2)
+        self.commands = 0
+        self.data_bytes = 0
+        self.writes = 0
+        self.transactions = 0
+        self.pixels = 0
+        self._pending = bytearray()
+        self._header = False
+        self._command = None
+        self._params = bytearray()
+        self._madctl = 0
+        self._columns = (0, _GRAM_WIDTH - 1)
+        self._rows = (0, _GRAM_HEIGHT - 1)
+        self._col = 0
+        self._row = 0
+        self._half = None
+
+    @property
+    def bytes(self):
+        """Total bytes sent on the bus."""
+        return self.commands + self.data_bytes
+
+    def feed(self, data):
+        """Consume trace bytes; records may be split across calls."""
+        pending = self._pending
+        pending.extend(data)
+        if not self._header:
+            if len(pending) < len(MAGIC):
+                return
+            if pending[:len(MAGIC)] != MAGIC:
+                raise ValueError('Not an ST7789 trace')
+            del pending[:len(MAGIC)]
+            self._header = True
+        pos = 0
+        end = len(pending)
+        while pos < end:
+            kind = pending[pos]
+            if kind == REC_SELECT:
+                self.transactions += 1
+                pos += 1
+            elif kind == REC_COMMAND:
+                if pos + 2 > end:
+                    break
+                self.command(pending[pos + 1])
+                pos += 2
+            elif kind == REC_DATA:
+                n = 0
+                shift = 0
+                p = pos + 1
+                while p < end:
+                    b = pending[p]
+                    n |= (b & 0x7F) << shift
+                    shift += 7
+                    p += 1
+                    if not b & 0x80:
+                        break
+                else:
+                    break
+                if p + n > end:
+                    break
+                self.data(memoryview(pending)[p:p + n])
+                pos = p + n
+            else:
+                raise ValueError('Bad trace record: {0}'.format(kind))
+        del pending[:pos]
+
+    def command(self, command):
+        """Apply a command byte."""
+        self.commands += 1
+        self._command = command
+        self._params = bytearray()
+        self._half = None
+        if command == _RAMWR:
+            self._col = self._columns[0]
+            self._row = self._rows[0]
+
+    def data(self, data):
+        """Apply a data write to the current command."""
+        self.writes += 1
+        self.data_bytes += len(data)
+        command = self._command
+        if command == _RAMWR:
+            self._write_pixels(data)
+            return
+        params = self._params
+        params.extend(data)
+        if command in (_CASET, _RASET) and len(params) >= 4:
+            window = (params[0] << 8 | params[1], params[2] << 8 | params[3])
+            if command == _CASET:
+                self._columns = window
+            else:
+                self._rows = window
+        elif command == _MADCTL and params:
+            self._madctl = params[0]
+
+    def _write_pixels(self, data):
+        i = 0
+        n = len(data)
+        if self._half is not None and n:
+            self._put(self._half, data[0])
+            self._half = None
+            i = 1
+        while i + 1 < n:
+            self._put(data[i], data[i + 1])
+            i += 2
+        if i < n:
+            self._half = data[i]
+
+    def _put(self, msb, lsb):
+        col = self._col
+        row = self._row
+        madctl = self._madctl
+        if madctl & _MADCTL_MV:
+            col, row = row, col
+        if madctl & _MADCTL_MX:
+            col = _GRAM_WIDTH - 1 - col
+        if madctl & _MADCTL_MY:
+            row = _GRAM_HEIGHT - 1 - row
+        if 0 <= col < _GRAM_WIDTH and 0 <= row < _GRAM_HEIGHT:
+            pos = (row * _GRAM_WIDTH + col) * 2
+            self.gram[pos] = msb
+            self.gram[pos + 1] = lsb
+        self.pixels += 1
+        # Address counter runs along the window columns, then rows
+        if self._col < self._columns[1]:
+            self._col += 1
+        else:
+            self._col = self._columns[0]
+            self._row = (self._row + 1 if self._row < self._rows[1]
+                         else self._rows[0])
+
+    def frame(self, x=0, y=0, w=_GRAM_WIDTH, h=_GRAM_HEIGHT):
+        """Return a region of frame memory as RGB565 bytes.
+
+        Args:
+            x, y (int): Top left corner in GRAM, e.g. 52, 40 for the
+                135x240 panel (default: 0, 0).
+            w, h (int): Size of the region (default: whole GRAM).
+        """
+        mv = memoryview(self.gram)
+        out = bytearray()
+        for row in range(y, y + h):
+            pos = (row * _GRAM_WIDTH + x) * 2
+            out.extend(mv[pos:pos + w * 2])
+        return bytes(out)
+
+    def stats(self):
+        """Return transfer totals as a dict."""
+        return {
+            'bytes': self.bytes,
+            'commands': self.commands,
+            'data_bytes': self.data_bytes,
+            'writes': self.writes,
+            'transactions': self.transactions,
+            'pixels': self.pixels,
+        }
+
+
+def replay(path):
+    """Replay a trace file and return the Replayer."""
+    replayer = Replayer()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                break
+            replayer.feed(chunk)
+    return replayer
+
+
+def compare(a, b):
+    """Compare two replayed traces.
+
+    Args:
+        a, b (Replayer): Replayed traces, e.g. before and after a change.
+    Returns:
+        dict: frame_equal and the (a, b) totals of every stat.
+    """
+    result = {'frame_equal': a.frame() == b.frame()}
+    stats_b = b.stats()
+    for key, value in a.stats().items():
+        result[key] = (value, stats_b[key])
+    return result
+
+
+def main(argv=None):
+    import sys
+    paths = sys.argv[1:] if argv is None else argv
+    if len(paths) == 1:
+        for key, value in replay(paths[0]).stats().items():
+            print('{0}: {1}'.format(key, value))
+    elif len(paths) == 2:
+        result = compare(replay(paths[0]), replay(paths[1]))
+        print('frame_equal: {0}'.format(result.pop('frame_equal')))
+        for key, (a, b) in result.items():
+            print('{0}: {1} -> {2} ({3:+d})'.format(key, a, b, b - a))
+    else:
+        print('usage: spi_trace.py TRACE [TRACE]')
+
+
+if __name__ == '__main__':
+    main()
@@ -6,12 +6,18 @@
     https://github.com/rdagger/micropython-ssd1351 <-- most of the functions including Fonts
     https://github.com/boochow/MicroPython-ST7735 <-- for text using the font sysfont
 '''
+import gc
 import time
-import ustruct as struct
-import framebuf
-from micropython import const
-from machine import SPI
-from math import cos, sin, pi, radians
+try:
+    import ustruct as struct
+except ImportError:  # CPython, e.g. host-side tools
+    import struct
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+from math import cos, sin, pi, radians, sqrt
 
 TFT_RAMWR = const(0x2C)
 TFT_SWRST = const(0x01)
@@ -55,6 +61,8 @@ ST77XX_RASET = const(0x2B)
 ST77XX_RAMWR = const(0x2C)
 ST77XX_RAMRD = const(0x2E)
 ST77XX_PTLAR = const(0x30)
+ST7789_VSCRDEF = const(0x33)
+ST7789_VSCSAD = const(0x37)
 ST7789_MADCTL = const(0x36)
 ST7789_MADCTL_MY = const(0x80)
 ST7789_MADCTL_MX = const(0x40)
@@ -91,10 +99,75 @@ _ENCODE_POS = ">HH"
 _DECODE_PIXEL = ">BBB"
 
 _BUFFER_SIZE = const(256)
-
-
-def delay_ms(ms):
-    time.sleep_ms(ms)
+# Widest background gap pixels() fills to join two runs of a row
+_MAX_RUN_GAP = const(6)
+
+# Drawing methods whose calls are counted while stats are enabled
+_STAT_PRIMITIVES = (
+    'pixel', 'pixels', 'hline', 'vline', 'rect', 'fill_rect', 'fill', 'line', 'lines',
+    'circle', 'ellipse', 'rectangle', 'polygon', 'fill_rectangle',
+    'fill_circle', 'fill_polygon', 'fill_rects', 'fill_circles', 'fill_vrect', 'fill_hrect',
+    'fill_ellipse', 'fill_gradient_h', 'fill_gradient_v',
+    'fill_gradient_radial', 'aa_line', 'aa_circle', 'blit_buffer',
+    'draw_letter', 'draw_text', 'text', 'char', 'draw_image', 'draw_sprite',
+)
+
+_mem_alloc = getattr(gc, 'mem_alloc', None)
+
+# Power on sequence: (command, data, delay in ms)
+_INIT_SEQUENCE = (
+    (ST7789_SLPOUT, None, 120),     # Sleep out
+    (ST7789_NORON, None, 0),        # Normal display mode on
+    #------------------------display and color format setting------------------------#
+    (ST7789_MADCTL, bytes([TFT_MAD_COLOR_ORDER]), 0),
+    (0xB6, b'\x0A\x82', 0),          # JLX240 display datasheet
+    (ST7789_COLMOD, b'\x55', 10),
+    #---------------------------ST7789V Frame rate setting----------------------------#
+    (ST7789_PORCTRL, b'\x0c\x0c\x00\x33\x33', 0),
+    (ST7789_GCTRL, b'\x35', 0),      # Voltages: VGH / VGL
+    #-----------------------------ST7789V Power setting-------------------------------#
+    (ST7789_VCOMS, b'\x28', 0),      # JLX240 display datasheet
+    (ST7789_LCMCTRL, b'\x0C', 0),
+    (ST7789_VDVVRHEN, b'\x01\xFF', 0),
+    (ST7789_VRHS, b'\x10', 0),       # voltage VRHS
+    (ST7789_VDVSET, b'\x20', 0),
+    (ST7789_FRCTR2, b'\x0f', 0),
+    (ST7789_PWCTRL1, b'\xa4\xa1', 0),
+    #-----------------------------ST7789V gamma setting-------------------------------#
+    (ST7789_PVGAMCTRL, b'\xd0\x00\x02\x07\x0a\x28\x32\x44\x42\x06\x0e\x12\x14\x17', 0),
+    (ST7789_NVGAMCTRL, b'\xd0\x00\x02\x07\x0a\x28\x31\x54\x47\x0e\x1c\x17\x1b\x1e', 0),
+    (ST7789_INVON, None, 0),
+    (ST7789_CASET, b'\x00\x00\x00\xE5', 0),    # Column address set, 239
+    (ST7789_RASET, b'\x00\x00\x01\x3F', 120),  # Row address set, 319
+    (ST7789_DISPON, None, 120),     # Display on
+)
+
+# ST7789 frame memory size, panels are mapped into a window of it
+_GRAM_WIDTH = const(240)
+_GRAM_HEIGHT = const(320)
+
+# MADCTL orientation bits for rotations of 0, 90, 180 and 270 degrees
+_ROTATIONS = (0x00,
+              ST7789_MADCTL_MV | ST7789_MADCTL_MX,
+              ST7789_MADCTL_MX | ST7789_MADCTL_MY,
+              ST7789_MADCTL_MV | ST7789_MADCTL_MY)
+
+
+try:
+    delay_ms = time.sleep_ms
+except AttributeError:  # CPython
+    def delay_ms(ms):
+        time.sleep(ms / 1000)
+
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:  # CPython
+    def ticks_us():
+        return int(time.perf_counter() * 1000000)
+
+    def ticks_diff(end, start):
+        return end - start
 
 
 def color565(r, g=0, b=0):
@@ -108,9 +181,273 @@ def color565(r, g=0, b=0):
     return (r & 0xf8) << 8 | (g & 0xfc) << 3 | b >> 3
 
 
+class Color(object):
+    """RGB565 color holding its encoded bytes for the drawing methods.
+
+    Every method taking an int color also takes a Color.  Pixels and fills
+    then copy the pre-encoded bytes instead of packing the value on every
+    call.  Use color() to share one object per value.
+
+    Attributes:
+        value (int): RGB565 value.
+        bytes (bytes): Big-endian encoding of value.
+    """
+
+    def __init__(self, value):
+        self.value = value
+        self.bytes = value.to_bytes(2, 'big')
+        self._pattern = None
+
+    def to_bytes(self, length=2, byteorder='big'):
+        """Encode like int.to_bytes, so fonts and buffers accept a Color."""
+        if length == 2 and byteorder == 'big':
+            return self.bytes
+        return self.value.to_bytes(length, byteorder)
+
+    def pattern(self):
+        """Return the color repeated to fill the chunk buffer, built once."""
+        if self._pattern is None:
+            self._pattern = self.bytes * _BUFFER_SIZE
+        return self._pattern
+
+    def __eq__(self, other):
+        return self.value == (other.value if isinstance(other, Color)
+                              else other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self.value
+
+    def __repr__(self):
+        return 'Color(0x{0:04X})'.format(self.value)
+
+
+# Registry of shared Color objects by value
+_colors = {}
+
+
+def color(value):
+    """Return the shared Color for an RGB565 value (or a Color)."""
+    if isinstance(value, Color):
+        return value
+    c = _colors.get(value)
+    if c is None:
+        c = _colors[value] = Color(value)
+    return c
+
+
+def _value(color):
+    """Return the RGB565 int of a Color or int."""
+    return color.value if isinstance(color, Color) else color
+
+
+class Palette(object):
+    """Named colors, registered once and shared as Color objects.
+
+        ui = Palette(text=0xFFFF, accent=color565(255, 128, 0))
+        display.fill_rect(0, 0, 10, 10, ui.accent)
+    """
+
+    def __init__(self, **colors):
+        for name, value in colors.items():
+            self.add(name, value)
+
+    def add(self, name, value):
+        """Register a color under a name and return it."""
+        c = color(value)
+        setattr(self, name, c)
+        return c
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def color_ramp(color1, color2, steps):
+    """Interpolate between two RGB565 colors using integer arithmetic.
+
+    Args:
+        color1 (int): RGB565 start color.
+        color2 (int): RGB565 end color.
+        steps (int): Number of colors to generate (first and last included).
+    Yields:
+        int: RGB565 color values.
+    """
+    color1 = _value(color1)
+    color2 = _value(color2)
+    # Channels in 16.16 fixed point, offset by one half to round
+    r = (color1 >> 11) << 16 | 0x8000
+    g = ((color1 >> 5) & 0x3F) << 16 | 0x8000
+    b = (color1 & 0x1F) << 16 | 0x8000
+    div = steps - 1 if steps > 1 else 1
+    dr = (((color2 >> 11) << 16 | 0x8000) - r) // div
+    dg = ((((color2 >> 5) & 0x3F) << 16 | 0x8000) - g) // div
+    db = (((color2 & 0x1F) << 16 | 0x8000) - b) // div
+    for _ in range(steps):
+        yield (r >> 16) << 11 | (g >> 16) << 5 | b >> 16
+        r += dr
+        g += dg
+        b += db
+
+
+def _counted(name, func, stats):
+    """Wrap a drawing method to count calls and heap allocations."""
+    def wrapper(*args, **kwargs):
+        calls = stats['calls']
+        calls[name] = calls.get(name, 0) + 1
+        # Allocations are measured around the outermost primitive only
+        if _mem_alloc is None or stats['depth']:
+            stats['depth'] += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats['depth'] -= 1
+        stats['depth'] = 1
+        start = _mem_alloc()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats['depth'] = 0
+            stats['alloc_bytes'] += _mem_alloc() - start
+    return wrapper
+
+
+class SPITransport(object):
+    """Commands and data over machine.SPI with DC and CS pins."""
+
+    def __init__(self, spi, dc, cs=None):
+        """Constructor for SPITransport object.
+
+        Args:
+            spi (SPI): Bus to the display.
+            dc (Pin): Data/command pin.
+            cs (Pin): Chip select pin (default: None, always selected).
+        """
+        self.spi = spi
+        self.dc = dc
+        self.cs = cs
+        if cs:
+            cs.init(cs.OUT, value=1)
+        dc.init(dc.OUT, value=0)
+
+    def command(self, command):
+        self.dc.off()
+        if self.cs:
+            self.cs.off()
+        self.spi.write(bytearray([command]))
+        if self.cs:
+            self.cs.on()
+
+    def data(self, data):
+        self.dc.on()
+        if self.cs:
+            self.cs.off()
+        if type(data) == type(1):
+            self.spi.write(bytearray([data]))
+        else:
+            self.spi.write(data)
+        if self.cs:
+            self.cs.on()
+
+    def readinto(self, command, buf):
+        """Send a read command and clock the reply into buf."""
+        self.dc.off()
+        if self.cs:
+            self.cs.off()
+        self.spi.write(bytearray([command]))
+        self.dc.on()
+        self.spi.readinto(buf)
+        if self.cs:
+            self.cs.on()
+
+    def flush(self):
+        pass
+
+    def deinit(self):
+        self.spi.deinit()
+
+
+
+class _TimedTransport(object):
+    """Transport proxy adding the time spent sending to the driver stats."""
+
+    def __init__(self, transport, stats):
+        self.transport = transport
+        self._stats = stats
+
+    def command(self, command):
+        start = ticks_us()
+        self.transport.command(command)
+        self._stats['spi_us'] += ticks_diff(ticks_us(), start)
+
+    def data(self, data):
+        start = ticks_us()
+        self.transport.data(data)
+        self._stats['spi_us'] += ticks_diff(ticks_us(), start)
+
+    def readinto(self, command, buf):
+        if command == ST77XX_RAMRD:
+            self._stats['windows'] += 1
+        start = ticks_us()
+        self.transport.readinto(command, buf)
+        self._stats['spi_us'] += ticks_diff(ticks_us(), start)
+
+    def flush(self):
+        start = ticks_us()
+        self.transport.flush()
+        self._stats['spi_us'] += ticks_diff(ticks_us(), start)
+
+    def __getattr__(self, name):
+        return getattr(self.transport, name)
+
+
+class _CountedPin(object):
+    """Chip select proxy counting level changes for the driver stats."""
+
+    def __init__(self, pin, stats):
+        self.pin = pin
+        self._stats = stats
+        # Chip select idles high
+        self._level = 1
+
+    def _set(self, level):
+        if level != self._level:
+            self._level = level
+            self._stats['cs_toggles'] += 1
+
+    def on(self):
+        self._set(1)
+        self.pin.on()
+
+    def off(self):
+        self._set(0)
+        self.pin.off()
+
+    def value(self, value=None):
+        if value is None:
+            return self.pin.value()
+        self._set(1 if value else 0)
+        self.pin.value(value)
+
+    __call__ = value
+
+    def __getattr__(self, name):
+        return getattr(self.pin, name)
+
+
+def _spi_transport(transport):
+    """Return the SPITransport a transport sends through, or None."""
+    while not isinstance(transport, SPITransport):
+        transport = getattr(transport, 'transport', None)
+        if transport is None:
+            return None
+    return transport
+
+
 class ST7789(object):
     def __init__(self, spi, width, height, rst, dc, cs, backlight=None,
-                 xstart=-1, ystart=-1):
+                 xstart=-1, ystart=-1, transport=None):
         """
         display = st7789.ST7789(
             SPI(baudrate=40000000, miso=Pin(x), mosi=Pin(y, Pin.OUT), sck=Pin(z, Pin.OUT) ),
@@ -119,6 +456,8 @@ class ST7789(object):
             dc=machine.Pin(16, machine.Pin.OUT),
         )
 
+        transport replaces spi, dc and cs, e.g. transport.MockTransport()
+        to draw without hardware or transport.CommandQueue to merge writes.
         """
         self.width = width
         self.height = height
@@ -129,8 +468,9 @@ class ST7789(object):
         self.cs = cs
         self.backlight = backlight
 
-        self.cs.init(self.cs.OUT, value=1)
-        self.dc.init(self.dc.OUT, value=0)
+        if transport is None:
+            transport = SPITransport(spi, dc, cs)
+        self.transport = transport
         if self.rst is not None:
             self.rst.init(self.rst.OUT, value=0)
 
@@ -152,8 +492,23 @@ class ST7789(object):
                 "Unsupported display. Only 240x240 and 135x240 are supported "
                 "without xstart and ystart provided"
             )
+        # Portrait geometry, other orientations are derived from it
+        self._native = (self.width, self.height, self.xstart, self.ystart)
+        self._stats = None
+        # Merged column spans of filled circles, by radius
+        self._circle_spans = {}
+        # Clip rectangle and origin as (ox, oy, x0, y0, x1, y1), None for
+        # the whole screen; pushed views are restored by pop_clip()
+        self._view = None
+        self._views = []
+        self._rotation = 0
+        self._madctl = TFT_MAD_COLOR_ORDER
 
         self.init_pins()
+        self.start()
+
+    def start(self):
+        """Reset the controller and run the power on sequence."""
         if self.rst is not None:
              self.reset()
         else:
@@ -200,22 +555,17 @@ class ST7789(object):
 
     def write(self, command, data=None):
         """SPI write to the device: commands and data"""
-        self.dc_low()
-        self.cs_low()
         if command is not None:
-            self.spi.write(bytearray([command]))
-        self.cs_high()
+            self.transport.command(command)
         if data is not None:
             self._data(data)
 
     def _data(self, data):
-        self.dc_high()
-        self.cs_low()
-        if type(data) == type(1):
-            self.spi.write(bytearray([data]))
-        else:
-            self.spi.write(data)
-        self.cs_high()
+        self.transport.data(data)
+
+    def flush(self):
+        """Send data still queued by the transport, e.g. a CommandQueue."""
+        self.transport.flush()
 
     def hard_reset(self):
         self.reset_low()
@@ -243,119 +593,31 @@ class ST7789(object):
         self.write(ST7789_COLMOD, bytes([mode & 0x77]))
 
     def init(self):
-        self.write(ST7789_SLPOUT)   # Sleep out
-        time.sleep_ms(120)
-
-        self.write(ST7789_NORON)    # Normal display mode on
-
-        #------------------------------display and color format setting--------------------------------#
-        self.write(ST7789_MADCTL)
-        # self._data(0x00)
-        self._data(TFT_MAD_COLOR_ORDER)
-
-        # JLX240 display datasheet
-        self.write(0xB6)
-        self._data(0x0A)
-        self._data(0x82)
-
-        self.write(ST7789_COLMOD)
-        self._data(0x55)
-        time.sleep_ms(10)
-
-        #--------------------------------ST7789V Frame rate setting----------------------------------#
-        self.write(ST7789_PORCTRL)
-        self._data(0x0c)
-        self._data(0x0c)
-        self._data(0x00)
-        self._data(0x33)
-        self._data(0x33)
-
-        self.write(ST7789_GCTRL)      # Voltages: VGH / VGL
-        self._data(0x35)
-
-        #---------------------------------ST7789V Power setting--------------------------------------#
-        self.write(ST7789_VCOMS)
-        self._data(0x28)        # JLX240 display datasheet
-
-        self.write(ST7789_LCMCTRL)
-        self._data(0x0C)
-
-        self.write(ST7789_VDVVRHEN)
-        self._data(0x01)
-        self._data(0xFF)
-
-        self.write(ST7789_VRHS)       # voltage VRHS
-        self._data(0x10)
-
-        self.write(ST7789_VDVSET)
-        self._data(0x20)
-
-        self.write(ST7789_FRCTR2)
-        self._data(0x0f)
-
-        self.write(ST7789_PWCTRL1)
-        self._data(0xa4)
-        self._data(0xa1)
-
-        #--------------------------------ST7789V gamma setting---------------------------------------#
-        self.write(ST7789_PVGAMCTRL)
-        self._data(0xd0)
-        self._data(0x00)
-        self._data(0x02)
-        self._data(0x07)
-        self._data(0x0a)
-        self._data(0x28)
-        self._data(0x32)
-        self._data(0x44)
-        self._data(0x42)
-        self._data(0x06)
-        self._data(0x0e)
-        self._data(0x12)
-        self._data(0x14)
-        self._data(0x17)
-
-        self.write(ST7789_NVGAMCTRL)
-        self._data(0xd0)
-        self._data(0x00)
-        self._data(0x02)
-        self._data(0x07)
-        self._data(0x0a)
-        self._data(0x28)
-        self._data(0x31)
-        self._data(0x54)
-        self._data(0x47)
-        self._data(0x0e)
-        self._data(0x1c)
-        self._data(0x17)
-        self._data(0x1b)
-        self._data(0x1e)
-
-        self.write(ST7789_INVON)
-
-        self.write(ST7789_CASET)    # Column address set
-        self._data(0x00)
-        self._data(0x00)
-        self._data(0x00)
-        self._data(0xE5)    # 239
-
-        self.write(ST7789_RASET)    # Row address set
-        self._data(0x00)
-        self._data(0x00)
-        self._data(0x01)
-        self._data(0x3F)    # 319
-
-        # /
-
-        time.sleep_ms(120)
-
-        self.write(ST7789_DISPON)  # Display on
-        time.sleep_ms(120)
+        for command, data, delay in self._init_sequence():
+            self.write(command, data)
+            if delay:
+                self.flush()
+                delay_ms(delay)
+
+    def _init_sequence(self):
+        """Return the power on sequence and reset the orientation state.
+
+        Returns:
+            tuple: (command, data, delay in ms) steps.
+        """
+        self._rotation = 0
+        self._madctl = TFT_MAD_COLOR_ORDER
+        (self.width, self.height,
+         self.xstart, self.ystart) = self._native
+        self._view = None
+        del self._views[:]
+        return _INIT_SEQUENCE
 
     def cleanup(self):
         """Clean up resources."""
         self.fill(0)
         self.display_off()
-        self.spi.deinit()
+        self.transport.deinit()
         print('display off')
 
     def display_off(self):
@@ -366,6 +628,47 @@ class ST7789(object):
         """Turn display on."""
         self.write(ST7789_DISPON)
 
+    @property
+    def rotation(self):
+        """Display rotation (0-3) in 90 degree clockwise steps.
+
+        Setting it writes MADCTL and updates width, height, xstart and
+        ystart, so all drawing uses the logical coordinates of the new
+        orientation.  None if MADCTL was set to a mirrored mode.
+        """
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, value):
+        self._rotation = value & 3
+        self._set_madctl(_ROTATIONS[self._rotation] |
+                         (self._madctl & ST7789_MADCTL_BGR))
+
+    def _geometry(self, madctl):
+        """Return width, height, xstart and ystart for a MADCTL value.
+
+        Args:
+            madctl (int): MADCTL register value.
+        """
+        width, height, xstart, ystart = self._native
+        if madctl & ST7789_MADCTL_MX:
+            xstart = _GRAM_WIDTH - width - xstart
+        if madctl & ST7789_MADCTL_MY:
+            ystart = _GRAM_HEIGHT - height - ystart
+        if madctl & ST7789_MADCTL_MV:
+            return height, width, ystart, xstart
+        return width, height, xstart, ystart
+
+    def _set_madctl(self, value):
+        """Write MADCTL and update the logical geometry to match."""
+        self._madctl = value
+        self.write(ST7789_MADCTL, bytes([value]))
+        (self.width, self.height,
+         self.xstart, self.ystart) = self._geometry(value)
+        # Clip rectangles of the old orientation no longer apply
+        self._view = None
+        del self._views[:]
+
     def _set_mem_access_mode(self, rotation, vert_mirror, horz_mirror, is_bgr):
         rotation &= 7
         value = {
@@ -386,7 +689,109 @@ class ST7789(object):
 
         if is_bgr:
             value |= ST7789_MADCTL_BGR
-        self.write(ST7789_MADCTL, bytes([value]))
+        orientation = value & (ST7789_MADCTL_MV | ST7789_MADCTL_MX |
+                               ST7789_MADCTL_MY)
+        if orientation in _ROTATIONS:
+            self._rotation = _ROTATIONS.index(orientation)
+        else:
+            self._rotation = None
+        self._set_madctl(value)
+
+    def enable_stats(self, enable=True):
+        """Turn driver instrumentation on or off.
+
+        Counting wrappers are installed on the instance only while enabled,
+        so a display without stats runs the plain methods.
+
+        Args:
+            enable (bool): True to start counting, False to stop.
+        """
+        if enable == (self._stats is not None):
+            return
+        if not enable:
+            for name in ('write', '_data') + _STAT_PRIMITIVES:
+                if name in self.__dict__:
+                    delattr(self, name)
+            self.transport = self.transport.transport
+            bus = _spi_transport(self.transport)
+            if bus is not None and isinstance(bus.cs, _CountedPin):
+                bus.cs = bus.cs.pin
+            self._stats = None
+            return
+        self._stats = {}
+        self.reset_stats()
+        stats = self._stats
+        write = self.write
+        data = self._data
+
+        def counted_write(command, data=None):
+            if command is not None:
+                stats['commands'] += 1
+                # Every RAMWR starts writing at the top of an address window
+                if command == ST77XX_RAMWR:
+                    stats['windows'] += 1
+            write(command, data)
+
+        def counted_data(buf):
+            stats['data_bytes'] += 1 if type(buf) == type(1) else len(buf)
+            data(buf)
+
+        self.write = counted_write
+        self._data = counted_data
+        for name in _STAT_PRIMITIVES:
+            setattr(self, name, _counted(name, getattr(self, name), stats))
+        # Chip select is counted at the pin, where it actually changes
+        bus = _spi_transport(self.transport)
+        if bus is not None and bus.cs:
+            bus.cs = _CountedPin(bus.cs, stats)
+        self.transport = _TimedTransport(self.transport, stats)
+
+    def reset_stats(self):
+        """Zero all instrumentation counters."""
+        stats = self._stats
+        if stats is None:
+            return
+        for key in ('commands', 'data_bytes', 'windows', 'cs_toggles',
+                    'spi_us', 'alloc_bytes', 'depth'):
+            stats[key] = 0
+        stats['calls'] = {}
+
+    def stats(self):
+        """Return instrumentation counters collected since the last reset.
+
+        Returns:
+            dict: commands, data_bytes, windows (address windows written or
+                read), cs_toggles (chip select level changes, 0 without an
+                SPI transport), spi_us (time in the transport), alloc_bytes (heap
+                allocated by drawing calls, MicroPython only) and calls
+                (per-primitive call counts); None if stats are disabled.
+        """
+        if self._stats is None:
+            return None
+        result = dict(self._stats)
+        del result['depth']
+        result['calls'] = dict(self._stats['calls'])
+        return result
+
+    def vscrdef(self, tfa, vsa, bfa):
+        """Set vertical scrolling definition.
+
+        Args:
+            tfa (int): Top fixed area in GRAM rows.
+            vsa (int): Vertical scrolling area in GRAM rows.
+            bfa (int): Bottom fixed area in GRAM rows.
+        Note:
+            tfa + vsa + bfa must equal 320, the GRAM height of the ST7789.
+        """
+        self.write(ST7789_VSCRDEF, struct.pack(">HHH", tfa, vsa, bfa))
+
+    def vscsad(self, vssa):
+        """Set vertical scroll start address.
+
+        Args:
+            vssa (int): GRAM row shown on the first line of the scroll area.
+        """
+        self.write(ST7789_VSCSAD, struct.pack(">H", vssa))
 
     def _encode_pos(self, x, y):
         """Encode a postion into bytes."""
@@ -394,6 +799,8 @@ class ST7789(object):
 
     def _encode_pixel(self, color):
         """Encode a pixel color into bytes."""
+        if isinstance(color, Color):
+            return color.bytes
         return struct.pack(_ENCODE_PIXEL, color)
 
     def vline(self, x, y, length, color):
@@ -403,12 +810,198 @@ class ST7789(object):
         self.fill_rect(x, y, length, 1, color)
 
     def pixel(self, x, y, color):
-        self.set_window(x, y, x, y)
-        self.write(None, self._encode_pixel(color))
+        clip = self._clip(x, y, 1, 1)
+        if clip is not None:
+            self.set_window(clip[0], clip[1], clip[0], clip[1])
+            self.write(None, self._encode_pixel(color))
+
+    def pixels(self, xs, ys, colors, background=None):
+        """Draw many points with as few transfers as possible.
+
+        Points are sorted by row and horizontally adjacent points are sent
+        as one run; runs on the same row share a single row address.  Each
+        run still costs a column address and a RAMWR, about as much as
+        pixel(), so isolated points only batch well with a background:
+        points of a row up to a few pixels apart are then sent as one run
+        with the background in the gaps, and when the points are dense
+        enough their bounding box is sent as one window instead, with every
+        other pixel of the box set to the background.
+
+        Args:
+            xs, ys (array): X and Y coordinates of the points.
+            colors (int or array): RGB565 color of all points or one each.
+            background (int): Color for the rest of a packed bounding box
+                (default: None = send runs only).
+        """
+        n = len(xs)
+        if not n:
+            return
+        single = isinstance(colors, (int, Color))
+        if single:
+            hi, lo = colors.to_bytes(2, 'big')
+        # Rows first, stable so later duplicates still win
+        order = sorted(range(n), key=lambda i: ys[i] * 4096 + xs[i])
+        buf = self._buf
+        mv = memoryview(buf)
+        ox, oy = self.origin
+        if background is not None:
+            x0 = min(xs)
+            w = max(xs) - x0 + 1
+            y0 = ys[order[0]]
+            h = ys[order[-1]] - y0 + 1
+            # A box pixel costs 2 bytes, a separate run about 13
+            clip = self._clip(x0, y0, w, h)
+            if w <= _BUFFER_SIZE and w * h <= 8 * n and clip is not None:
+                cx, cy, cw, ch = clip
+                self.set_window(cx, cy, cx + cw - 1, cy + ch - 1)
+                left = (cx - ox - x0) * 2
+                fill = background.to_bytes(2, 'big') * w
+                k = 0
+                for py in range(cy - oy, cy - oy + ch):
+                    mv[:w * 2] = fill
+                    while k < n and ys[order[k]] < py:
+                        k += 1
+                    while k < n and ys[order[k]] == py:
+                        i = order[k]
+                        pos = (xs[i] - x0) * 2
+                        if not single:
+                            c = _value(colors[i])
+                            hi = c >> 8
+                            lo = c & 0xFF
+                        buf[pos] = hi
+                        buf[pos + 1] = lo
+                        k += 1
+                    self._data(mv[left:left + cw * 2])
+                return
+        # Background pixels worth sending to join runs: a run costs about
+        # 13 bytes, a gap pixel 2
+        if background is not None:
+            max_gap = _MAX_RUN_GAP
+            bg_hi, bg_lo = background.to_bytes(2, 'big')
+        else:
+            max_gap = 0
+        run = 0
+        start = y = 0
+        row = None
+        for k in range(n + 1):
+            if k < n:
+                i = order[k]
+                px = xs[i]
+                py = ys[i]
+                gap = px - start - run
+                if run and py == y and 0 <= gap <= max_gap and \
+                        run + gap < _BUFFER_SIZE:
+                    for _ in range(gap):
+                        buf[run * 2] = bg_hi
+                        buf[run * 2 + 1] = bg_lo
+                        run += 1
+                    if not single:
+                        c = _value(colors[i])
+                        hi = c >> 8
+                        lo = c & 0xFF
+                    buf[run * 2] = hi
+                    buf[run * 2 + 1] = lo
+                    run += 1
+                    continue
+            if run:
+                clip = self._clip(start, y, run, 1)
+                if clip is not None:
+                    cx, cy, cw = clip[:3]
+                    if cy != row:
+                        self._set_rows(cy, cy)
+                        row = cy
+                    self._set_columns(cx, cx + cw - 1)
+                    pos = (cx - ox - start) * 2
+                    self.write(ST77XX_RAMWR, mv[pos:pos + cw * 2])
+            if k < n:
+                start = px
+                y = py
+                if not single:
+                    c = _value(colors[i])
+                    hi = c >> 8
+                    lo = c & 0xFF
+                buf[0] = hi
+                buf[1] = lo
+                run = 1
+
+    def read_window(self, x, y, w, h, into=None):
+        """Read a rectangle of frame memory back as RGB565.
+
+        Uses RAMRD, which answers with a dummy byte and then 18-bit pixels
+        (one byte per channel), converted back to big-endian RGB565 as
+        taken by blit_buffer.  Saving the area under a popup and restoring
+        it afterwards needs only a buffer the size of the popup:
+            saved = display.read_window(x, y, w, h)
+            ...
+            display.blit_buffer(saved, x, y, w, h)
+        Needs MISO wired to the panel; the ST7789 reads at a lower SPI
+        clock than it writes.
+
+        Args:
+            x, y (int): Top left corner.
+            w, h (int): Size of the rectangle.
+            into (bytearray): Buffer of w * h * 2 bytes to fill (default:
+                new buffer).
+        Returns:
+            bytearray: The pixels; those outside the clip are unchanged.
+        """
+        if into is None:
+            into = bytearray(w * h * 2)
+        clip = self._clip(x, y, w, h)
+        if clip is None:
+            return into
+        cx, cy, cw, ch = clip
+        ox, oy = self.origin
+        stride = w * 2
+        left = (cx - ox - x) * 2
+        top = cy - oy - y
+        rows = max(1, 768 // cw)
+        raw = bytearray(1 + min(rows, ch) * cw * 3)
+        row = 0
+        while row < ch:
+            n = min(rows, ch - row)
+            self._set_columns(cx, cx + cw - 1)
+            self._set_rows(cy + row, cy + row + n - 1)
+            self.transport.readinto(ST77XX_RAMRD,
+                                    memoryview(raw)[:1 + n * cw * 3])
+            # Skip the dummy byte, then R, G, B in the top bits of a byte
+            i = 1
+            for r in range(row, row + n):
+                pos = (top + r) * stride + left
+                for _ in range(cw):
+                    into[pos] = (raw[i] & 0xF8) | raw[i + 1] >> 5
+                    into[pos + 1] = (raw[i + 1] << 3 & 0xE0) | raw[i + 2] >> 3
+                    i += 3
+                    pos += 2
+            row += n
+        return into
 
     def blit_buffer(self, buffer, x, y, width, height):
-        self.set_window(x, y, x + width - 1, y + height - 1)
-        self.write(None, buffer)
+        """Draw an RGB565 buffer, clipped to the visible area.
+
+        Args:
+            buffer (bytes): Pixel data, width * height pixels.
+            x, y (int): Top left corner (may be off screen).
+            width, height (int): Size of the buffer in pixels.
+        """
+        clip = self._clip(x, y, width, height)
+        if clip is None:
+            return
+        cx, cy, cw, ch = clip
+        ox, oy = self.origin
+        x += ox
+        y += oy
+        self.set_window(cx, cy, cx + cw - 1, cy + ch - 1)
+        mv = memoryview(buffer)
+        stride = width * 2
+        pos = (cy - y) * stride + (cx - x) * 2
+        if cw == width:
+            self._data(mv[pos:pos + ch * stride])
+            return
+        # Partly visible horizontally: send the visible part of each row
+        for _ in range(ch):
+            self._data(mv[pos:pos + cw * 2])
+            pos += stride
 
     def rect(self, x, y, w, h, color):
         self.hline(x, y, w, color)
@@ -447,21 +1040,76 @@ class ST7789(object):
         Returns:
             boolean: False = Coordinates OK, True = Error.
         """
-        if xmin < 0:
-            print('x-coordinate: {0} below minimum of 0.'.format(xmin))
-            return True
-        if ymin < 0:
-            print('y-coordinate: {0} below minimum of 0.'.format(ymin))
-            return True
-        if xmax >= self.width:
-            print('x-coordinate: {0} above maximum of {1}.'.format(
-                xmax, self.width - 1))
-            return True
-        if ymax >= self.height:
-            print('y-coordinate: {0} above maximum of {1}.'.format(
-                ymax, self.height - 1))
-            return True
-        return False
+        return (xmin < 0 or ymin < 0 or xmax >= self.width or
+                ymax >= self.height)
+
+    @property
+    def origin(self):
+        """Screen position of local coordinate 0, 0 set by push_clip()."""
+        view = self._view
+        return (0, 0) if view is None else view[:2]
+
+    def push_clip(self, x, y, w, h, translate=True):
+        """Restrict drawing to a rectangle until the matching pop_clip().
+
+        Clip rectangles nest, each one is intersected with the current one.
+        All primitives are clipped to it before any data is sent.  The stack
+        is cleared when the rotation changes.
+
+        Args:
+            x, y (int): Top left corner in current local coordinates.
+            w, h (int): Size of the rectangle.
+            translate (bool): Move the origin to x, y so widgets draw in
+                coordinates local to the rectangle (default: True).
+        """
+        ox, oy = self.origin
+        clip = self._clip(x, y, w, h)
+        if clip is None:
+            x0 = y0 = x1 = y1 = 0
+        else:
+            x0, y0, x1, y1 = clip
+            x1 += x0
+            y1 += y0
+        if translate:
+            ox += x
+            oy += y
+        self._views.append(self._view)
+        self._view = (ox, oy, x0, y0, x1, y1)
+
+    def pop_clip(self):
+        """Restore the clip rectangle and origin of the last push_clip()."""
+        self._view = self._views.pop()
+
+    def _clip(self, x, y, w, h):
+        """Clip a rectangle to the visible area.
+
+        Args:
+            x, y (int): Top left corner in local coordinates.
+            w, h (int): Width and height.
+        Returns:
+            (int, int, int, int): Visible x, y, w, h in screen coordinates
+                or None if nothing is visible.
+        """
+        view = self._view
+        if view is None:
+            cx0 = cy0 = 0
+            cx1 = self.width
+            cy1 = self.height
+        else:
+            ox, oy, cx0, cy0, cx1, cy1 = view
+            x += ox
+            y += oy
+        x0 = x if x > cx0 else cx0
+        y0 = y if y > cy0 else cy0
+        x1 = x + w
+        y1 = y + h
+        if x1 > cx1:
+            x1 = cx1
+        if y1 > cy1:
+            y1 = cy1
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1 - x0, y1 - y0
 
 
     def draw_letter(self, x, y, letter, font, color, background=0,
@@ -477,74 +1125,177 @@ class ST7789(object):
             background (int): RGB565 background color (default: black).
             landscape (bool): Orientation (default: False = portrait)
         """
-        buf, w, h = font.get_letter(letter, color, background,
-                                    landscape)
+        buf, w, h = font.get_letter(letter, color, background)
         # Check for errors
         if w == 0:
             return w, h
-
-        if landscape:
-            y -= w
-            if self.is_off_grid(x, y, x + h - 1, y + w - 1):
-                return
-            self.set_window(x, y,
-                       x + h - 1, y + w - 1,
-                       buf)
-        else:
-            if self.is_off_grid(x, y, x + w - 1, y + h - 1):
-                return
-
-            self.set_window(y, x,
-                       y + h - 1,  x + w - 1,
-                       buf)
-
+        self._draw_glyphs(x, y, ((buf, w),), w, h, background, landscape, 0)
         return w, h
 
     def draw_text(self, x, y, text, font, color,  background=0,
-                  landscape=False, spacing=1):
+                  landscape=False, spacing=1, cache=None):
         """Draw text.
 
         Args:
             x (int): Starting X position.
             y (int): Starting Y position.
             text (string): Text to draw.
-            font (XglcdFont object): Font.
+            font (XglcdFont or GlyphAtlas object): Font.
             color (int): RGB565 color value.
             background (int): RGB565 background color (default: black).
             landscape (bool): Orientation (default: False = portrait)
             spacing (int): Pixels between letters (default: 1)
+            cache (LabelCache): Rendered labels to draw from, so a repeated
+                label is sent as one buffer (default: None).
         """
-        for letter in text:
-            # Get letter array and letter dimensions
-            w, h = self.draw_letter(x, y, letter, font, color, background,
-                                    landscape)
-            # Stop on error
-            if w == 0 or h == 0:
-                print('Invalid width {0} or height {1}'.format(w, h))
-                return
+        if cache is not None:
+            label = cache.label(text, font, color, background, spacing)
+            self._draw_glyphs(x, y, (label,), label[1], font.height,
+                              background, landscape, 0)
+            return
+        glyphs = (font.get_letter(letter, color, background)[:2]
+                  for letter in text)
+        self._draw_glyphs(x, y, glyphs, font.measure_text(text, spacing),
+                          font.height, background, landscape, spacing)
 
-            if landscape:
-                # Fill in spacing
-                if spacing:
-                    self.fill_hrect(x, y - w - spacing, h, spacing, background)
-                # Position y for next letter
-                y -= (w + spacing)
-            else:
-                # Fill in spacing
-                if spacing:
-                    self.fill_vrect(x + w, y, spacing, h, background)
-                # Position x for next letter
-                x += w + spacing
+    def _draw_glyphs(self, x, y, glyphs, width, height, background=0,
+                     landscape=False, spacing=1):
+        """Draw column ordered glyph data under a single window.
 
-    def fill_rect(self, x, y, width, height, color):
+        Glyph buffers hold one column of pixels after another.  Instead of
+        reordering them in software, MADCTL is switched to exchange rows and
+        columns while they are written.  Landscape text is drawn upwards from
+        y by also rotating the address mapping 270 degrees.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position (bottom edge when landscape).
+            glyphs (iterable): (buffer, width) pairs of glyph pixel data.
+            width (int): Total width of glyphs and spacing in pixels.
+            height (int): Height of glyphs in pixels.
+            background (int): RGB565 background color (default: black).
+            landscape (bool): Orientation (default: False = portrait)
+            spacing (int): Pixels between glyphs (default: 1)
+        """
+        if self._rotation is None:
+            # Mirrored MADCTL modes have no rotated counterpart to switch to
+            self._draw_columns(x, y, glyphs, height, background, landscape,
+                               spacing)
+            return
+        view = self._view
+        if view is None:
+            cx0 = cy0 = 0
+            cx1 = self.width
+            cy1 = self.height
+        else:
+            ox, oy, cx0, cy0, cx1, cy1 = view
+            x += ox
+            y += oy
+        rotation = self._rotation or 0
+        if landscape:
+            # Map position and clip rectangle into the rotated frame
+            x, y = self.height - y, x
+            cx0, cy0, cx1, cy1 = (self.height - cy1, cx0,
+                                  self.height - cy0, cx1)
+            rotation = (rotation + 3) & 3
+        madctl = _ROTATIONS[rotation]
+        xstart, ystart = self._geometry(madctl)[2:]
+        # Visible part in the coordinates of the frame drawn in
+        vx0 = x if x > cx0 else cx0
+        vy0 = y if y > cy0 else cy0
+        vx1 = min(x + width, cx1)
+        vy1 = min(y + height, cy1)
+        if vx0 >= vx1 or vy0 >= vy1:
+            return
+        self.write(ST7789_MADCTL, bytes([(madctl ^ ST7789_MADCTL_MV) |
+                                         (self._madctl & ST7789_MADCTL_BGR)]))
+        # Rows and columns are exchanged: columns address y, rows address x
+        self.write(ST7789_CASET, self._encode_pos(vy0 + ystart,
+                                                  vy1 - 1 + ystart))
+        self.write(ST7789_RASET, self._encode_pos(vx0 + xstart,
+                                                  vx1 - 1 + xstart))
+        self.write(ST77XX_RAMWR)
+        gap = background.to_bytes(2, 'big') * (height * spacing)
+        stride = height * 2
+        top = (vy0 - y) * 2
+        size = (vy1 - vy0) * 2
+        col = x
+        for buf, w in glyphs:
+            if not w:
+                continue
+            for data, n in ((buf, w), (gap, spacing)):
+                # Columns of this buffer that are visible
+                a = vx0 - col if vx0 > col else 0
+                b = vx1 - col if vx1 - col < n else n
+                if a < b:
+                    mv = memoryview(data)
+                    if size == stride:
+                        self._data(mv[a * stride:b * stride])
+                    else:
+                        for pos in range(a * stride + top, b * stride,
+                                         stride):
+                            self._data(mv[pos:pos + size])
+                col += n
+            if col >= vx1:
+                break
+        self.write(ST7789_MADCTL, bytes([self._madctl]))
+
+    def _draw_columns(self, x, y, glyphs, height, background, landscape,
+                      spacing):
+        """Draw column ordered glyph data one column at a time.
+
+        Slow path of _draw_glyphs for any MADCTL mode.  Portrait columns are
+        written top to bottom, landscape columns left to right on the rows
+        above y.
+        """
+        gap = background.to_bytes(2, 'big') * (height * spacing)
+        stride = height * 2
+        for buf, w in glyphs:
+            if not w:
+                continue
+            for data, n in ((buf, w), (gap, spacing)):
+                mv = memoryview(data)
+                for pos in range(0, n * stride, stride):
+                    if landscape:
+                        y -= 1
+                        self.blit_buffer(mv[pos:pos + stride], x, y,
+                                         height, 1)
+                    else:
+                        self.blit_buffer(mv[pos:pos + stride], x, y,
+                                         1, height)
+                        x += 1
+
+    def _fill_buf(self, color, pixels=_BUFFER_SIZE):
+        """Fill the chunk buffer with a color.
+
+        Args:
+            color (int): RGB565 color value.
+            pixels (int): Fill only this many pixels at the start, e.g. for
+                a short span (default: the whole buffer).
+        """
+        size = min(pixels, _BUFFER_SIZE) * 2
+        if isinstance(color, Color) and color.value:
+            self._buf[:size] = memoryview(color.pattern())[:size]
+            return
+        color = _value(color)
         if color:
            pixel = self._encode_pixel(color)
         else:
            pixel = self._colormap[0:2]  # background
 
-        for i in range(_BUFFER_SIZE):
-            self._buf[2*i] = pixel[0]
-            self._buf[2*i+1] = pixel[1]
+        buf = self._buf
+        buf[0] = pixel[0]
+        buf[1] = pixel[1]
+        # Double the filled part until enough of the buffer is filled
+        mv = memoryview(buf)
+        n = 2
+        while n < size:
+            m = min(n, size - n)
+            mv[n:n + m] = mv[:m]
+            n += m
+
+    def _fill_window(self, x, y, width, height):
+        """Send a clipped rectangle of the color in the chunk buffer."""
         chunks, rest = divmod(width * height, _BUFFER_SIZE)
 
         self.set_window(x, y, x + width - 1, y + height - 1)
@@ -556,6 +1307,61 @@ class ST7789(object):
             mv = memoryview(self._buf)
             self._data(mv[:rest*2])
 
+    def fill_rect(self, x, y, width, height, color):
+        clip = self._clip(x, y, width, height)
+        if clip is None:
+            return
+        # Short spans, e.g. of lines, only fill what they send
+        self._fill_buf(color, clip[2] * clip[3])
+        self._fill_window(*clip)
+
+    def fill_rects(self, rects, colors, sort=False):
+        """Draw many filled rectangles in one call.
+
+        The batch is clipped up front.  Consecutive rectangles of one color
+        that share an edge are merged into a single window, and the chunk
+        buffer is only refilled when the color changes.
+
+        Args:
+            rects (array): Flat x, y, w, h values of every rectangle.
+            colors (int or array): RGB565 color of all rectangles or one each.
+            sort (bool): Group rectangles by color first.  Only use it when
+                rectangles of different colors do not overlap, as it changes
+                the drawing order (default: False).
+        """
+        single = isinstance(colors, (int, Color))
+        shapes = []
+        for i in range(len(rects) // 4):
+            clip = self._clip(rects[4 * i], rects[4 * i + 1],
+                              rects[4 * i + 2], rects[4 * i + 3])
+            if clip is not None:
+                shapes.append((colors if single else colors[i],) + clip)
+        if sort and not single:
+            shapes.sort(key=lambda shape: (_value(shape[0]), shape[1],
+                                          shape[2]))
+        filled = None
+        pending = None
+        for shape in shapes:
+            if pending is not None:
+                color, x, y, w, h = pending
+                if shape[0] == color:
+                    # Stack on top of each other or side by side
+                    if shape[1] == x and shape[3] == w and shape[2] == y + h:
+                        pending = (color, x, y, w, h + shape[4])
+                        continue
+                    if shape[2] == y and shape[4] == h and shape[1] == x + w:
+                        pending = (color, x, y, w + shape[3], h)
+                        continue
+                if color != filled:
+                    self._fill_buf(color)
+                    filled = color
+                self._fill_window(x, y, w, h)
+            pending = shape
+        if pending is not None:
+            if pending[0] != filled:
+                self._fill_buf(pending[0])
+            self._fill_window(*pending[1:])
+
     def clear(self):
         self.fill(0)
 
@@ -565,7 +1371,11 @@ class ST7789(object):
 
     def line(self, x0, y0, x1, y1, color):
         # Line drawing function.  Will draw a single pixel wide line starting at
-        # x0, y0 and ending at x1, y1.
+        # x0, y0 and ending at x1, y1.  Pixels sharing a row (or column for
+        # steep lines) are drawn as one clipped span.
+        if self._clip(min(x0, x1), min(y0, y1),
+                      abs(x1 - x0) + 1, abs(y1 - y0) + 1) is None:
+            return
         steep = abs(y1 - y0) > abs(x1 - x0)
         if steep:
             x0, y0 = y0, x0
@@ -580,17 +1390,156 @@ class ST7789(object):
             ystep = 1
         else:
             ystep = -1
+        start = x0
         while x0 <= x1:
-            if steep:
-                self.pixel(y0, x0, color)
-            else:
-                self.pixel(x0, y0, color)
             err -= dy
-            if err < 0:
-                y0 += ystep
-                err += dx
+            if err < 0 or x0 == x1:
+                if steep:
+                    self.vline(y0, start, x0 - start + 1, color)
+                else:
+                    self.hline(start, y0, x0 - start + 1, color)
+                start = x0 + 1
+                if err < 0:
+                    y0 += ystep
+                    err += dx
             x0 += 1
 
+    def _aa_span(self, x, y, levels, vertical, far_first, table):
+        """Draw a run of anti-aliased pixel pairs as one window.
+
+        Args:
+            x, y (int): Top left corner of the run.
+            levels (bytearray): Coverage (0-15) of the far pixel of each pair,
+                the near pixel gets the remainder.
+            vertical (bool): Pairs are side by side and the run goes down,
+                otherwise pairs are stacked and the run goes right.
+            far_first (bool): Far pixel is the upper/left one of each pair.
+            table (bytearray): Blend levels from blend.lut.
+        """
+        n = len(levels)
+        buf = self._buf
+        # Row major: either two rows of n pixels or n rows of two pixels
+        second = 0 if vertical else 2 * n
+        step = 4 if vertical else 2
+        other = 2 if vertical else second
+        i = 0
+        for f in levels:
+            near = 2 * (15 - f)
+            far = 2 * f
+            if far_first:
+                near, far = far, near
+            buf[i] = table[near]
+            buf[i + 1] = table[near + 1]
+            buf[i + other] = table[far]
+            buf[i + other + 1] = table[far + 1]
+            i += step
+        if vertical:
+            self.blit_buffer(memoryview(buf)[:4 * n], x, y, 2, n)
+        else:
+            self.blit_buffer(memoryview(buf)[:4 * n], x, y, n, 2)
+
+    def aa_line(self, x0, y0, x1, y1, color, background=0):
+        """Draw an anti-aliased line (Xiaolin Wu's algorithm).
+
+        Pixels are blended against a known background color.  Pixel pairs
+        that share a row (or column for steep lines) are merged into a
+        single window.
+
+        Args:
+            x0, y0 (int): Starting point.
+            x1, y1 (int): End point.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+        """
+        if self._clip(min(x0, x1) - 1, min(y0, y1) - 1,
+                      abs(x1 - x0) + 3, abs(y1 - y0) + 3) is None:
+            return
+        from blend import lut
+        table = lut(_value(color), _value(background))
+        steep = abs(y1 - y0) > abs(x1 - x0)
+        if steep:
+            x0, y0 = y0, x0
+            x1, y1 = y1, x1
+        if x0 > x1:
+            x0, x1 = x1, x0
+            y0, y1 = y1, y0
+        dx = x1 - x0
+        gradient = ((y1 - y0) << 16) // dx if dx else 0
+        # Position along the minor axis in 16.16 fixed point
+        inter = y0 << 16
+        max_run = _BUFFER_SIZE // 2
+        levels = bytearray()
+        start = x0
+        run_y = y0
+        for x in range(x0, x1 + 1):
+            iy = inter >> 16
+            if iy != run_y or len(levels) == max_run:
+                self._aa_emit(start, run_y, levels, steep, table)
+                levels = bytearray()
+                start = x
+                run_y = iy
+            levels.append((inter >> 12) & 0x0F)
+            inter += gradient
+        self._aa_emit(start, run_y, levels, steep, table)
+
+    def _aa_emit(self, start, minor, levels, steep, table):
+        """Draw a line run, swapping axes back for steep lines."""
+        if steep:
+            self._aa_span(minor, start, levels, True, False, table)
+        else:
+            self._aa_span(start, minor, levels, False, False, table)
+
+    def aa_circle(self, x0, y0, r, color, background=0):
+        """Draw an anti-aliased circle (Xiaolin Wu's algorithm).
+
+        Args:
+            x0 (int): X coordinate of center point.
+            y0 (int): Y coordinate of center point.
+            r (int): Radius.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+        """
+        if self._clip(x0 - r - 1, y0 - r - 1, 2 * r + 3, 2 * r + 3) is None:
+            return
+        from blend import lut
+        table = lut(_value(color), _value(background))
+        r2 = r * r
+        max_run = _BUFFER_SIZE // 2
+        levels = bytearray()
+        start = 0
+        run_y = r
+        x = 0
+        while True:
+            # Circle edge below (x0 + x) with a 4-bit fraction
+            y16 = int(sqrt(r2 - x * x) * 16) if x <= r else -1
+            iy = y16 >> 4
+            if iy != run_y or x > iy or len(levels) == max_run:
+                if levels:
+                    self._aa_octants(x0, y0, start, run_y, levels, table)
+                if x > iy:
+                    break
+                levels = bytearray()
+                start = x
+                run_y = iy
+            levels.append(y16 & 0x0F)
+            x += 1
+
+    def _aa_octants(self, x0, y0, xs, iy, levels, table):
+        """Draw one circle run mirrored into all eight octants."""
+        xe = xs + len(levels) - 1
+        rev = levels[::-1]
+        span = self._aa_span
+        # Runs along x, pairs stacked vertically
+        span(x0 + xs, y0 + iy, levels, False, False, table)
+        span(x0 - xe, y0 + iy, rev, False, False, table)
+        span(x0 + xs, y0 - iy - 1, levels, False, True, table)
+        span(x0 - xe, y0 - iy - 1, rev, False, True, table)
+        # Runs along y, pairs side by side
+        span(x0 + iy, y0 + xs, levels, True, False, table)
+        span(x0 - iy - 1, y0 + xs, levels, True, True, table)
+        span(x0 + iy, y0 - xe, rev, True, False, table)
+        span(x0 - iy - 1, y0 - xe, rev, True, True, table)
+
     def lines(self, coords, color):
         """Draw multiple lines.
 
@@ -614,6 +1563,8 @@ class ST7789(object):
             r (int): Radius.
             color (int): RGB565 color value.
         """
+        if self._clip(x0 - r, y0 - r, 2 * r + 1, 2 * r + 1) is None:
+            return
         f = 1 - r
         dx = 1
         dy = -r - r
@@ -653,6 +1604,8 @@ class ST7789(object):
             up to complete on a full pixel.  Therefore the major and
             minor axes are increased by 1.
         """
+        if self._clip(x0 - a, y0 - b, 2 * a + 1, 2 * b + 1) is None:
+            return
         a2 = a * a
         b2 = b * b
         twoa2 = a2 + a2
@@ -750,8 +1703,6 @@ class ST7789(object):
             h (int): Height of rectangle.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
-            return
         if w > h:
             self.fill_hrect(x, y, w, h, color)
         else:
@@ -766,12 +1717,29 @@ class ST7789(object):
             r (int): Radius.
             color (int): RGB565 color value.
         """
+        if self._clip(x0 - r, y0 - r, 2 * r + 1, 2 * r + 1) is None:
+            return
+        for dx, w, dy in self._spans(r):
+            self.fill_rect(x0 + dx, y0 - dy, w, 2 * dy + 1, color)
+
+    def _spans(self, r):
+        """Return the merged column spans of a filled circle of radius r.
+
+        Returns:
+            tuple: (dx, width, half height) of blocks of columns of equal
+                height, relative to the center, cached per radius.
+        """
+        spans = self._circle_spans.get(r)
+        if spans is not None:
+            return spans
+        # Half height of each column right of the center (midpoint circle)
+        heights = bytearray(r + 1) if r < 256 else [0] * (r + 1)
         f = 1 - r
         dx = 1
         dy = -r - r
         x = 0
         y = r
-        self.vline(x0, y0 - r, 2 * r + 1, color)
+        heights[0] = r
         while x < y:
             if f >= 0:
                 y -= 1
@@ -780,11 +1748,57 @@ class ST7789(object):
             x += 1
             dx += 2
             f += dx
-            self.vline(x0 + x, y0 - y, 2 * y + 1, color)
-            self.vline(x0 - x, y0 - y, 2 * y + 1, color)
-            self.vline(x0 - y, y0 - x, 2 * x + 1, color)
-            self.vline(x0 + y, y0 - x, 2 * x + 1, color)
+            heights[x] = max(heights[x], y)
+            heights[y] = max(heights[y], x)
+        # Merge neighbouring columns of equal height, mirrored left
+        spans = []
+        start = 0
+        for x in range(1, r + 2):
+            if x > r or heights[x] != heights[start]:
+                if start:
+                    spans.append((start, x - start, heights[start]))
+                    spans.append((-x + 1, x - start, heights[start]))
+                else:
+                    spans.append((-x + 1, 2 * x - 1, heights[0]))
+                start = x
+        spans = tuple(spans)
+        self._circle_spans[r] = spans
+        return spans
+
+    def fill_circles(self, circles, colors, sort=False):
+        """Draw many filled circles in one call.
 
+        Column spans are computed once per radius and cached.  Circles
+        outside the clip are skipped before any data is generated, and the
+        chunk buffer is only refilled when the color changes.
+
+        Args:
+            circles (array): Flat x, y, r values of every circle.
+            colors (int or array): RGB565 color of all circles or one each.
+            sort (bool): Group circles by color first.  Only use it when
+                circles of different colors do not overlap, as it changes
+                the drawing order (default: False).
+        """
+        single = isinstance(colors, (int, Color))
+        order = range(len(circles) // 3)
+        if sort and not single:
+            order = sorted(order, key=lambda i: _value(colors[i]))
+        filled = None
+        for i in order:
+            x0 = circles[3 * i]
+            y0 = circles[3 * i + 1]
+            r = circles[3 * i + 2]
+            if self._clip(x0 - r, y0 - r, 2 * r + 1, 2 * r + 1) is None:
+                continue
+            color = colors if single else colors[i]
+            for dx, w, dy in self._spans(r):
+                clip = self._clip(x0 + dx, y0 - dy, w, 2 * dy + 1)
+                if clip is None:
+                    continue
+                if color != filled:
+                    self._fill_buf(color)
+                    filled = color
+                self._fill_window(*clip)
 
     def fill_polygon(self, sides, x0, y0, r, color, rotate=0):
         """Draw a filled n-sided regular polygon.
@@ -878,25 +1892,7 @@ class ST7789(object):
             h (int): Height of rectangle.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
-            return
-        chunk_width = 1024 // h
-        chunk_count, remainder = divmod(w, chunk_width)
-        chunk_size = chunk_width * h
-        chunk_x = x
-        if chunk_count:
-            buf = color.to_bytes(2, 'big') * chunk_size
-            for c in range(0, chunk_count):
-                self.set_window(chunk_x, y,
-                           chunk_x + chunk_width - 1, y + h - 1,
-                           buf)
-                chunk_x += chunk_width
-
-        if remainder:
-            buf = color.to_bytes(2, 'big') * remainder * h
-            self.set_window(chunk_x, y,
-                       chunk_x + remainder - 1, y + h - 1,
-                       buf)
+        self.fill_rect(x, y, w, h, color)
 
     def fill_hrect(self, x, y, w, h, color):
         """Draw a filled rectangle (optimized for horizontal drawing).
@@ -908,25 +1904,157 @@ class ST7789(object):
             h (int): Height of rectangle.
             color (int): RGB565 color value.
         """
-        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
+        self.fill_rect(x, y, w, h, color)
+
+    def _gradient_window(self, x, y, w, h, fill, *args):
+        """Open a window on the visible part of a gradient.
+
+        Gradients wider than the chunk buffer are drawn by calling fill
+        again once per strip of buffer width, each strip a clip rectangle.
+
+        Args:
+            x, y (int): Top left corner.
+            w, h (int): Size of the rectangle.
+            fill (function): Gradient method drawing x, y, w, h, *args.
+        Returns:
+            (memoryview, int, int, int, int): Reused row buffer of the
+                visible width and the visible x, y, w, h, None if nothing
+                is left to draw.
+        """
+        clip = self._clip(x, y, w, h)
+        if clip is None:
+            return None
+        cx, cy, cw, ch = clip
+        if cw > _BUFFER_SIZE:
+            ox, oy = self.origin
+            for sx in range(cx, cx + cw, _BUFFER_SIZE):
+                self.push_clip(sx - ox, cy - oy,
+                               min(_BUFFER_SIZE, cx + cw - sx), ch,
+                               translate=False)
+                fill(x, y, w, h, *args)
+                self.pop_clip()
+            return None
+        self.set_window(cx, cy, cx + cw - 1, cy + ch - 1)
+        return (memoryview(self._buf)[:cw * 2],) + clip
+
+    def fill_gradient_h(self, x, y, w, h, color1, color2):
+        """Draw a rectangle with a horizontal (left to right) gradient.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            color1 (int): RGB565 color of the left edge.
+            color2 (int): RGB565 color of the right edge.
+        """
+        window = self._gradient_window(x, y, w, h, self.fill_gradient_h,
+                                       color1, color2)
+        if window is None:
+            return
+        row, cx, cy, cw, ch = window
+        x += self.origin[0]
+        # The ramp spans the whole rectangle, keep its visible columns
+        start = (cx - x) * 2
+        end = start + cw * 2
+        i = 0
+        for color in color_ramp(color1, color2, w):
+            if start <= i < end:
+                row[i - start] = color >> 8
+                row[i - start + 1] = color & 0xFF
+            i += 2
+        # Every row is the same, stream it under the one window
+        for _ in range(ch):
+            self._data(row)
+
+    def fill_gradient_v(self, x, y, w, h, color1, color2):
+        """Draw a rectangle with a vertical (top to bottom) gradient.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            color1 (int): RGB565 color of the top edge.
+            color2 (int): RGB565 color of the bottom edge.
+        """
+        window = self._gradient_window(x, y, w, h, self.fill_gradient_v,
+                                       color1, color2)
+        if window is None:
             return
-        chunk_height = 1024 // w
-        chunk_count, remainder = divmod(h, chunk_height)
-        chunk_size = chunk_height * w
-        chunk_y = y
-        if chunk_count:
-            buf = color.to_bytes(2, 'big') * chunk_size
-            for c in range(0, chunk_count):
-                self.set_window(x, chunk_y,
-                           x + w - 1, chunk_y + chunk_height - 1,
-                           buf)
-                chunk_y += chunk_height
-
-        if remainder:
-            buf = color.to_bytes(2, 'big') * remainder * w
-            self.set_window(x, chunk_y,
-                       x + w - 1, chunk_y + remainder - 1,
-                       buf)
+        row, cx, cy, cw, ch = window
+        y += self.origin[1]
+        size = cw * 2
+        # The ramp spans the whole rectangle, skip rows outside the window
+        py = y - 1
+        for color in color_ramp(color1, color2, h):
+            py += 1
+            if py < cy:
+                continue
+            if py >= cy + ch:
+                break
+            row[0] = color >> 8
+            row[1] = color & 0xFF
+            # Double the filled part until the row is complete
+            n = 2
+            while n < size:
+                m = min(n, size - n)
+                row[n:n + m] = row[:m]
+                n += m
+            self._data(row)
+
+    def fill_gradient_radial(self, x, y, w, h, color1, color2,
+                             cx=None, cy=None, r=None):
+        """Draw a rectangle with a radial gradient.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            color1 (int): RGB565 color at the center.
+            color2 (int): RGB565 color at radius r and beyond.
+            cx, cy (int): Center (default: center of the rectangle).
+            r (int): Radius of the gradient (default: half the longer side).
+        """
+        cx = x + w // 2 if cx is None else cx
+        cy = y + h // 2 if cy is None else cy
+        r = max(w, h) // 2 if r is None else r
+        window = self._gradient_window(x, y, w, h, self.fill_gradient_radial,
+                                       color1, color2, cx, cy, r)
+        if window is None:
+            return
+        row, x, y, w, h = window
+        ox, oy = self.origin
+        cx += ox
+        cy += oy
+        # Color per integer distance, as big-endian byte pairs
+        lut = bytearray(2 * (r + 1))
+        i = 0
+        for color in color_ramp(color1, color2, r + 1):
+            lut[i] = color >> 8
+            lut[i + 1] = color & 0xFF
+            i += 2
+        dx0 = x - cx
+        d = 0
+        for py in range(y, y + h):
+            dy2 = (py - cy) * (py - cy)
+            dx = dx0
+            d2 = dx * dx + dy2
+            i = 0
+            for _ in range(w):
+                # Integer square root, tracked incrementally along the row
+                while d * d > d2:
+                    d -= 1
+                while (d + 1) * (d + 1) <= d2:
+                    d += 1
+                k = 2 * d if d < r else 2 * r
+                row[i] = lut[k]
+                row[i + 1] = lut[k + 1]
+                i += 2
+                d2 += dx + dx + 1
+                dx += 1
+            self._data(row)
 
     def fill_ellipse(self, x0, y0, a, b, color):
         """Draw a filled ellipse.
@@ -942,6 +2070,8 @@ class ST7789(object):
             up to complete on a full pixel.  Therefore the major and
             minor axes are increased by 1.
         """
+        if self._clip(x0 - a, y0 - b, 2 * a + 1, 2 * b + 1) is None:
+            return
         a2 = a * a
         b2 = b * b
         twoa2 = a2 + a2
@@ -981,11 +2111,18 @@ class ST7789(object):
             self.line(x0 - x, y0 - y, x0 - x, y0 + y, color)
 
 
-    def text(self, aPos, aString, aColor, aFont, aSize = 1, nowrap = False):
+    def text(self, aPos, aString, aColor, aFont, aSize = 1, nowrap = False,
+             cache = None):
 
         if aFont == None:
           return
 
+        #Size 1 lines can be drawn from rendered labels (see LabelCache),
+        # the column between letters is then cleared too.
+        if cache != None and aSize in (1, (1, 1)):
+          self._text_labels(aPos, aString, aColor, aFont, nowrap, cache)
+          return
+
         #Make a size either from single value or 2 elements.
         if (type(aSize) == int) or (type(aSize) == float):
           wh = (aSize, aSize)
@@ -1007,6 +2144,20 @@ class ST7789(object):
               px = aPos[0]
 
 
+    def _text_labels(self, aPos, aString, aColor, aFont, nowrap, cache):
+        px, py = aPos
+        width = aFont["Width"] + 1
+        #Letters per line, wrapped where text() wraps them
+        n = max((self.width - px) // width, 1)
+        for i in range(0, len(aString), n):
+          line = aString[i:i + n]
+          label = cache.label(line, aFont, aColor)
+          self._draw_glyphs(px, py, (label,), label[1], aFont["Height"],
+                            0, False, 0)
+          if nowrap:
+            break
+          py += aFont["Height"] + 1
+
     def char(self, aPos, aChar, aColor, aFont, aSizes):
 
         if aFont == None:
@@ -1024,16 +2175,17 @@ class ST7789(object):
           charA = aFont["Data"][ci:ci + fontw]
           px = aPos[0]
           if aSizes[0] <= 1 and aSizes[1] <= 1 :
+            hi, lo = aColor.to_bytes(2, 'big')
             buf = bytearray(2 * fonth * fontw)
             for q in range(fontw) :
               c = charA[q]
               for r in range(fonth) :
                 if c & 0x01 :
                   pos = 2 * (r * fontw + q)
-                  buf[pos] = aColor >> 8
-                  buf[pos + 1] = aColor & 0xff
+                  buf[pos] = hi
+                  buf[pos + 1] = lo
                 c >>= 1
-            self.set_window(aPos[0], aPos[1], aPos[0] + fontw - 1, aPos[1] + fonth - 1, buf)
+            self.blit_buffer(buf, aPos[0], aPos[1], fontw, fonth)
           else:
             for c in charA :
               py = aPos[1]
@@ -1054,27 +2206,46 @@ class ST7789(object):
             w (int): Width of image.  Default is 128.
             h (int): Height of image.  Default is 128.
         """
-        x2 = x + w - 1
-        y2 = y + h - 1
-        if self.is_off_grid(x, y, x2, y2):
-            return
         with open(path, "rb") as f:
-            chunk_height = 1024 // w
-            chunk_count, remainder = divmod(h, chunk_height)
-            chunk_size = chunk_height * w * 2
-            chunk_y = y
-            if chunk_count:
-                for c in range(0, chunk_count):
-                    buf = f.read(chunk_size)
-                    self.set_window(x, chunk_y,
-                               x2, chunk_y + chunk_height - 1,
-                               buf)
-                    chunk_y += chunk_height
-            if remainder:
-                buf = f.read(remainder * w * 2)
-                self.set_window(x, chunk_y,
-                           x2, chunk_y + remainder - 1,
-                           buf)
+            for _ in self._image_chunks(f, x, y, w, h):
+                pass
+
+    def _image_chunks(self, f, x, y, w, h):
+        """Send the visible part of an image file under one window.
+
+        Generator yielding after each chunk of rows is sent, so callers
+        can interleave other work.
+
+        Args:
+            f (file): Open image file positioned at the first pixel.
+            x, y (int): Top left corner of the image (may be off screen).
+            w, h (int): Size of the image.
+        """
+        clip = self._clip(x, y, w, h)
+        if clip is None:
+            return
+        cx, cy, cw, ch = clip
+        ox, oy = self.origin
+        x += ox
+        y += oy
+        self.set_window(cx, cy, cx + cw - 1, cy + ch - 1)
+        stride = w * 2
+        if cy > y:
+            f.seek(f.tell() + (cy - y) * stride)
+        chunk_height = max(1, 1024 // w)
+        left = (cx - x) * 2
+        rows = ch
+        while rows:
+            n = min(rows, chunk_height)
+            buf = f.read(n * stride)
+            if cw == w:
+                self._data(buf)
+            else:
+                mv = memoryview(buf)
+                for pos in range(left, n * stride, stride):
+                    self._data(mv[pos:pos + cw * 2])
+            rows -= n
+            yield
 
     def draw_sprite(self, buf, x, y, w, h):
         """Draw a sprite (optimized for horizontal drawing).
@@ -1086,11 +2257,7 @@ class ST7789(object):
             w (int): Width of drawing.
             h (int): Height of drawing.
         """
-        x2 = x + w - 1
-        y2 = y + h - 1
-        if self.is_off_grid(x, y, x2, y2):
-            return
-        self.set_window(x, y, x2, y2, buf)
+        self.blit_buffer(buf, x, y, w, h)
 
     def load_sprite(self, path, w, h):
         """Load sprite image.
@@ -0,0 +1,118 @@
+"""uasyncio friendly drawing for ST7789 displays.
+
+Long operations are split into chunks with a yield to the event loop between
+them, and reset delays use asyncio sleeps instead of blocking the CPU.  Runs
+under uasyncio on the board and asyncio on CPython (e.g. with
+spi_trace.Recorder in place of the SPI bus).
+"""
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+from st7789 import ST7789, ST77XX_SWRESET
+
+try:
+    sleep_ms = asyncio.sleep_ms
+except AttributeError:  # CPython asyncio
+    def sleep_ms(ms):
+        return asyncio.sleep(ms / 1000)
+
+
+class ST7789Async(ST7789):
+    """ST7789 with coroutine variants of blocking operations.
+
+    Note:
+        The constructor does not reset or initialize the controller,
+        await start_async() before drawing.
+    """
+
+    # Chunks of the chunk buffer sent between yields to the event loop
+    YIELD_EVERY = 4
+
+    def start(self):
+        """Defer the power on sequence to start_async."""
+        pass
+
+    async def start_async(self):
+        """Reset the controller and run the power on sequence."""
+        if self.rst is not None:
+            await self.reset_async()
+        else:
+            await self.soft_reset_async()
+        await self.init_async()
+
+    async def reset_async(self):
+        self.rst(0)
+        await sleep_ms(500)
+        self.rst(1)
+        await sleep_ms(500)
+
+    async def soft_reset_async(self):
+        self.write(ST77XX_SWRESET)
+        await sleep_ms(500)
+
+    async def init_async(self):
+        for command, data, delay in self._init_sequence():
+            self.write(command, data)
+            if delay:
+                self.flush()
+                await sleep_ms(delay)
+
+    async def fill_rect_async(self, x, y, width, height, color):
+        """Fill a rectangle, yielding between chunks."""
+        clip = self._clip(x, y, width, height)
+        if clip is None:
+            return
+        x, y, width, height = clip
+        self._fill_buf(color)
+        chunks, rest = divmod(width * height, len(self._buf) // 2)
+        self.set_window(x, y, x + width - 1, y + height - 1)
+        for i in range(chunks):
+            self._data(self._buf)
+            if i % self.YIELD_EVERY == self.YIELD_EVERY - 1:
+                await sleep_ms(0)
+        if rest:
+            self._data(memoryview(self._buf)[:rest * 2])
+
+    async def fill_async(self, color):
+        """Fill the screen, yielding between chunks."""
+        await self.fill_rect_async(0, 0, self.width, self.height, color)
+
+    async def draw_image_async(self, path, x=0, y=0, w=128, h=128):
+        """Draw image from flash, yielding after every chunk read.
+
+        Args:
+            path (string): Image file path.
+            x (int): X coordinate of image left.  Default is 0.
+            y (int): Y coordinate of image top.  Default is 0.
+            w (int): Width of image.  Default is 128.
+            h (int): Height of image.  Default is 128.
+        """
+        with open(path, "rb") as f:
+            for _ in self._image_chunks(f, x, y, w, h):
+                await sleep_ms(0)
+
+    async def draw_text_async(self, x, y, text, font, color, background=0,
+                              landscape=False, spacing=1):
+        """Draw text, yielding after every letter.
+
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            text (string): Text to draw.
+            font (XglcdFont object): Font.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+            landscape (bool): Orientation (default: False = portrait)
+            spacing (int): Pixels between letters (default: 1)
+        """
+        for letter in text:
+            buf, w, h = font.get_letter(letter, color, background)
+            if w:
+                self._draw_glyphs(x, y, ((buf, w),), w + spacing, h,
+                                  background, landscape, spacing)
+                if landscape:
+                    y -= w + spacing
+                else:
+                    x += w + spacing
+            await sleep_ms(0)
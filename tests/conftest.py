@@ -0,0 +1,11 @@
+"""Host-side tests: the driver runs on CPython against transport models."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def path(*parts):
+    """Return a path inside the repository."""
+    return os.path.join(ROOT, *parts)
@@ -0,0 +1,38 @@
+"""Frames drawn through ST7789Async match the synchronous driver."""
+import asyncio
+
+import pytest
+
+import transport
+from conftest import path
+from st7789 import ST7789
+from st7789_async import ST7789Async
+from xglcd_font import XglcdFont
+
+PANEL = (52, 40, 135, 240)
+IMAGE = path('images', 'Python41x49.raw')
+
+
+@pytest.fixture(scope='module')
+def font():
+    return XglcdFont(path('fonts', 'Unispace12x24.c'), 12, 24)
+
+
+def test_async_matches_sync(font):
+    sync = ST7789(None, 135, 240, None, None, None,
+                  transport=transport.MockTransport())
+    sync.fill_rect(10, 10, 100, 200, 0x1234)
+    sync.draw_image(IMAGE, 20, 30, 41, 49)
+    sync.draw_text(0, 150, 'Async', font, 0xFFFF, 0x0010)
+
+    async def draw(display):
+        await display.start_async()
+        await display.fill_rect_async(10, 10, 100, 200, 0x1234)
+        await display.draw_image_async(IMAGE, 20, 30, 41, 49)
+        await display.draw_text_async(0, 150, 'Async', font, 0xFFFF, 0x0010)
+
+    display = ST7789Async(None, 135, 240, None, None, None,
+                          transport=transport.MockTransport())
+    asyncio.run(draw(display))
+    assert (display.transport.frame(*PANEL) ==
+            sync.transport.frame(*PANEL))
@@ -0,0 +1,102 @@
+"""fill_rects and fill_circles draw like one call per shape."""
+import random
+from array import array
+
+import pytest
+
+import transport
+from st7789 import ST7789
+
+PANEL = (52, 40, 135, 240)
+COLORS = [0xF800, 0x07E0, 0x001F, 0xFFE0]
+
+
+def make():
+    return ST7789(None, 135, 240, None, None, None,
+                  transport=transport.MockTransport())
+
+
+def rects(n, seed):
+    rnd = random.Random(seed)
+    values = array('h')
+    for _ in range(n):
+        values.extend((rnd.randrange(-20, 135), rnd.randrange(-20, 240),
+                       rnd.randrange(1, 60), rnd.randrange(1, 60)))
+    return values, array('H', (rnd.choice(COLORS) for _ in range(n)))
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_fill_rects(seed):
+    values, colors = rects(40, seed)
+    display = make()
+    display.fill_rects(values, colors)
+    expected = make()
+    for i, c in enumerate(colors):
+        expected.fill_rect(*values[4 * i:4 * i + 4], c)
+    assert (display.transport.frame(*PANEL) ==
+            expected.transport.frame(*PANEL))
+
+
+def test_fill_rects_merges_edges():
+    # A column of stacked rows and a row of side by side cells
+    values = array('h')
+    for y in range(10, 50, 4):
+        values.extend((10, y, 30, 4))
+    for x in range(50, 110, 6):
+        values.extend((x, 80, 6, 9))
+    display = make()
+    display.fill_rects(values, 0x07E0)
+    expected = make()
+    for i in range(len(values) // 4):
+        expected.fill_rect(*values[4 * i:4 * i + 4], 0x07E0)
+    assert (display.transport.frame(*PANEL) ==
+            expected.transport.frame(*PANEL))
+    assert display.transport.writes < expected.transport.writes
+
+
+def test_fill_rects_sorted():
+    # Disjoint rectangles, so grouping by color keeps the frame
+    values = array('h')
+    colors = array('H')
+    for i in range(20):
+        values.extend((i % 5 * 26, i // 5 * 50, 20, 40))
+        colors.append(COLORS[i % 4])
+    display = make()
+    display.fill_rects(values, colors, sort=True)
+    expected = make()
+    for i, c in enumerate(colors):
+        expected.fill_rect(*values[4 * i:4 * i + 4], c)
+    assert (display.transport.frame(*PANEL) ==
+            expected.transport.frame(*PANEL))
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_fill_circles(seed):
+    rnd = random.Random(seed)
+    circles = array('h')
+    for _ in range(25):
+        circles.extend((rnd.randrange(-10, 145), rnd.randrange(-10, 250),
+                        rnd.randrange(0, 30)))
+    colors = array('H', (rnd.choice(COLORS) for _ in range(25)))
+    display = make()
+    display.fill_circles(circles, colors)
+    expected = make()
+    for i, c in enumerate(colors):
+        expected.fill_circle(*circles[3 * i:3 * i + 3], c)
+    assert (display.transport.frame(*PANEL) ==
+            expected.transport.frame(*PANEL))
+
+
+def test_fill_circles_clipped():
+    circles = array('h', [10, 10, 15, 60, 120, 20, 130, 235, 12])
+    display = make()
+    display.push_clip(5, 5, 100, 200)
+    display.fill_circles(circles, 0xFFFF)
+    display.pop_clip()
+    expected = make()
+    expected.push_clip(5, 5, 100, 200)
+    for i in range(3):
+        expected.fill_circle(*circles[3 * i:3 * i + 3], 0xFFFF)
+    expected.pop_clip()
+    assert (display.transport.frame(*PANEL) ==
+            expected.transport.frame(*PANEL))
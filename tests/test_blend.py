@@ -0,0 +1,28 @@
+"""blend_blit composites onto any kind of background."""
+import transport
+from blend import blend565, blend_blit
+from st7789 import ST7789, color
+
+FG = 0xF81F
+BG = 0x07E0
+
+
+def make():
+    return ST7789(None, 135, 240, None, None, None,
+                  transport=transport.MockTransport())
+
+
+def test_backgrounds():
+    src = FG.to_bytes(2, 'big') * 6
+    expected = blend565(FG, BG, 5).to_bytes(2, 'big') * 6
+    display = make()
+    pixels = BG.to_bytes(2, 'big') * 6
+    for background in (pixels, bytearray(pixels), BG, color(BG)):
+        display.clear()
+        blend_blit(display, 4, 8, 3, 2, src, background, alpha=5)
+        assert display.read_window(4, 8, 3, 2) == expected
+    # Mutable buffers hold the result, bytes are left alone
+    buf = bytearray(pixels)
+    blend_blit(display, 4, 8, 3, 2, src, buf, alpha=5)
+    assert buf == expected
+    assert pixels == BG.to_bytes(2, 'big') * 6
@@ -0,0 +1,64 @@
+"""Color and Palette entries draw like the RGB565 ints they hold."""
+from array import array
+
+import pytest
+
+import transport
+from st7789 import ST7789, Palette, color
+
+PANEL = (52, 40, 135, 240)
+VALUES = [0xF800, 0x07E0, 0x001F, 0xFFE0]
+
+
+def make():
+    return ST7789(None, 135, 240, None, None, None,
+                  transport=transport.MockTransport())
+
+
+def frames(draw):
+    """Return the frames of draw with int colors and with Color objects."""
+    ints = make()
+    draw(ints, VALUES)
+    objects = make()
+    draw(objects, [color(v) for v in VALUES])
+    return ints.transport.frame(*PANEL), objects.transport.frame(*PANEL)
+
+
+@pytest.mark.parametrize('sort', [False, True])
+def test_fill_rects(sort):
+    rects = array('h', [0, 0, 20, 20, 30, 0, 20, 20, 60, 0, 20, 20,
+                        90, 0, 20, 20])
+    a, b = frames(lambda d, c: d.fill_rects(rects, c, sort))
+    assert a == b
+
+
+@pytest.mark.parametrize('sort', [False, True])
+def test_fill_circles(sort):
+    circles = array('h', [20, 20, 10, 60, 20, 10, 20, 60, 10, 60, 60, 10])
+    a, b = frames(lambda d, c: d.fill_circles(circles, c, sort))
+    assert a == b
+
+
+@pytest.mark.parametrize('background', [None, 0x0010])
+def test_pixels(background):
+    xs = array('h', [5, 6, 9, 40])
+    ys = array('h', [5, 5, 5, 7])
+
+    def draw(display, colors):
+        bg = background
+        if bg is not None and not isinstance(colors[0], int):
+            bg = color(bg)
+        display.pixels(xs, ys, colors, bg)
+    a, b = frames(draw)
+    assert a == b
+
+
+def test_palette_entries():
+    ui = Palette(accent=0xF800, text=0xFFFF)
+    a = make()
+    a.fill_rect(0, 0, 10, 10, 0xF800)
+    a.fill_circle(50, 50, 8, 0xFFFF)
+    b = make()
+    b.fill_rect(0, 0, 10, 10, ui.accent)
+    b.fill_circle(50, 50, 8, ui['text'])
+    assert a.transport.frame(*PANEL) == b.transport.frame(*PANEL)
@@ -0,0 +1,56 @@
+"""Frames flushed from a DisplayList match drawing every frame in full."""
+import transport
+from display_list import DisplayList
+from st7789 import ST7789
+
+PANEL = (52, 40, 135, 240)
+
+
+def make():
+    return ST7789(None, 135, 240, None, None, None,
+                  transport=transport.MockTransport())
+
+
+def full(ops):
+    """Draw the ops of one frame on a cleared display."""
+    display = make()
+    display.fill(0)
+    for args in ops:
+        display.fill_rectangle(*args)
+    return display.transport.frame(*PANEL)
+
+
+def check(frames):
+    display = make()
+    display.fill(0)
+    dl = DisplayList(display)
+    sent = []
+    for ops in frames:
+        for args in ops:
+            dl.fill_rectangle(*args)
+        sent.append(dl.flush())
+        assert display.transport.frame(*PANEL) == full(ops)
+    return sent
+
+
+RED = (10, 10, 60, 60, 0xF800)
+BLUE = (40, 40, 60, 60, 0x001F)
+GREEN = (100, 150, 20, 20, 0x07E0)
+
+
+def test_unchanged_frame_sends_nothing():
+    assert check([[RED, BLUE, GREEN], [RED, BLUE, GREEN]]) == [3, 0]
+
+
+def test_moved_op_clears_and_redraws_overlaps():
+    moved = (20, 100, 60, 60, 0x001F)
+    sent = check([[RED, BLUE, GREEN], [RED, moved, GREEN]])
+    # Clear the old BLUE, redraw RED under it, draw the new BLUE
+    assert sent[1] == 3
+
+
+def test_z_order_swap():
+    sent = check([[RED, BLUE, GREEN], [BLUE, RED, GREEN],
+                  [RED, BLUE, GREEN]])
+    # Only the op now on top is sent, GREEN does not overlap it
+    assert sent[1:] == [1, 1]
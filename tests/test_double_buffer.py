@@ -0,0 +1,64 @@
+"""DoubleBuffer draws like the display clipped to its region."""
+import pytest
+
+import transport
+from double_buffer import DoubleBuffer
+from st7789 import ST7789
+
+PANEL = (52, 40, 135, 240)
+REGION = (10, 20, 40, 30)
+SPRITE = bytes(range(256)) * 2
+
+
+def make():
+    return ST7789(None, 135, 240, None, None, None,
+                  transport=transport.MockTransport())
+
+
+def draw(target, blit):
+    # Inside, across every edge and fully outside the region
+    target.fill_rect(5, 5, 10, 10, 0xF800)
+    target.fill_rect(-5, -3, 12, 8, 0x07E0)
+    target.fill_rect(33, 25, 20, 20, 0x001F)
+    target.fill_rect(50, 0, 5, 5, 0xFFFF)
+    blit(SPRITE[:11 * 9 * 2], -4, 24, 11, 9)
+    blit(SPRITE[:8 * 8 * 2], 36, -3, 8, 8)
+    blit(SPRITE[:6 * 6 * 2], 100, 100, 6, 6)
+    target.pixel(39, 29, 0xFFE0)
+    target.pixel(40, 29, 0xFFE0)
+    target.pixel(-1, 0, 0xFFE0)
+
+
+def test_clipped_like_display():
+    display = make()
+    buffer = DoubleBuffer(display, *REGION)
+    try:
+        draw(buffer, buffer.blit)
+        buffer.swap()
+        buffer.wait()
+    finally:
+        buffer.stop()
+    expected = make()
+    expected.push_clip(*REGION)
+    draw(expected, expected.blit_buffer)
+    expected.pop_clip()
+    assert (display.transport.frame(*PANEL) ==
+            expected.transport.frame(*PANEL))
+
+
+def test_flush_error_is_raised():
+    display = make()
+    buffer = DoubleBuffer(display, *REGION)
+    try:
+        def fail(*args):
+            raise OSError('bus')
+        display.blit_buffer = fail
+        buffer.swap()
+        with pytest.raises(OSError):
+            buffer.wait()
+        # The lock was released, so the buffer keeps working
+        del display.blit_buffer
+        buffer.swap()
+        buffer.wait()
+    finally:
+        buffer.stop()
@@ -0,0 +1,120 @@
+"""Fonts and glyph caches draw the same pixels as the fonts they wrap."""
+import pytest
+
+import sysfont
+import transport
+from conftest import path
+from glyph_atlas import AtlasCache, GlyphAtlas
+from label_cache import LabelCache
+from paged_font import PagedFont, write_paged_font
+from st7789 import ST7789
+from xglcd_font import XglcdFont
+
+PANEL = (52, 40, 135, 240)
+
+
+@pytest.fixture(scope='module')
+def display():
+    return ST7789(None, 135, 240, None, None, None,
+                  transport=transport.MockTransport())
+
+
+@pytest.fixture(scope='module')
+def font():
+    return XglcdFont(path('fonts', 'Unispace12x24.c'), 12, 24)
+
+
+@pytest.fixture(scope='module')
+def paged(font, tmp_path_factory):
+    # ASCII plus the same letters again as box drawing codepoints
+    box = XglcdFont(path('fonts', 'Unispace12x24.c'), 12, 24, 0x2500, 96)
+    out = str(tmp_path_factory.mktemp('fonts') / 'unispace.pgf')
+    write_paged_font(out, [font, box], page_size=4)
+    paged = PagedFont(out, pages=2)
+    yield paged
+    paged.close()
+
+
+def render(display, *args, **kwargs):
+    display.clear()
+    display.draw_text(*args, **kwargs)
+    return display.transport.frame(*PANEL)
+
+
+def test_lower_bound(font):
+    assert font.get_letter('\x05', 0xFFFF)[1] == 0
+    assert font.measure_text('\x05') == 0
+
+
+def test_paged_font_matches_source(font, paged):
+    for letter in 'Hello, World! ~':
+        box = chr(ord(letter) - 32 + 0x2500)
+        expected = bytes(font.get_letter(letter, 0xF800, 0x1234)[0])
+        assert bytes(paged.get_letter(letter, 0xF800, 0x1234)[0]) == expected
+        assert bytes(paged.get_letter(box, 0xF800, 0x1234)[0]) == expected
+    assert paged.measure_text('Hi━') == font.measure_text('Hi!')
+    assert len(paged._pages) <= 2
+
+
+def test_missing_letters_are_silent(font, paged, capsys):
+    for f in (font, paged):
+        assert f.get_letter('\u00e9', 0xFFFF) == (b'', 0, 0)
+    assert capsys.readouterr().out == ''
+
+
+@pytest.mark.parametrize('landscape', (False, True))
+def test_atlas_matches_font(display, font, landscape):
+    atlas = GlyphAtlas(font, 0xFFE0, 0x0010)
+    args = (3, 150, 'Hi~ 9!')
+    assert (render(display, *args, atlas, 0xFFE0, 0x0010,
+                   landscape=landscape) ==
+            render(display, *args, font, 0xFFE0, 0x0010, landscape=landscape))
+
+
+def test_atlas_from_paged_font(display, paged):
+    text = 'Hi ┨┩'
+    atlas = GlyphAtlas(paged, 0xFFFF, chars=text)
+    assert atlas.measure_text(text) == paged.measure_text(text)
+    assert (render(display, 0, 0, text, atlas, 0xFFFF) ==
+            render(display, 0, 0, text, paged, 0xFFFF))
+    cache = AtlasCache()
+    assert cache.get(paged, 0xFFFF) is cache.get(paged, 0xFFFF)
+
+
+def test_atlas_from_sysfont(display):
+    display.clear()
+    display.text((5, 7), 'Abc!', 0xF800, sysfont.sysfont)
+    expected = display.transport.frame(*PANEL)
+    atlas = GlyphAtlas(sysfont.sysfont, 0xF800, chars='Abc!')
+    assert render(display, 5, 7, 'Abc!', atlas, 0xF800) == expected
+
+
+def test_label_cache_matches_font(display, font):
+    cache = LabelCache()
+    for _ in range(2):
+        assert (render(display, -5, 100, 'Menu', font, 0xFFFF, 0x0010,
+                       cache=cache) ==
+                render(display, -5, 100, 'Menu', font, 0xFFFF, 0x0010))
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.invalidate(font=font)
+    assert cache.size == 0
+
+
+def test_aa_font_blends_levels(display, tmp_path, capsys):
+    from aa_font import AAFont, write_aa_font
+    from blend import blend565
+    levels = [(i * 7) % 16 for i in range(3 * 5)]
+    out = str(tmp_path / 'tiny.aaf')
+    write_aa_font(out, [(3, levels), (2, levels[:10])], 5, start_letter=65)
+    aa = AAFont(out)
+    buf, w, h = aa.get_letter('A', 0xF800, 0x001F)
+    assert (w, h) == (3, 5)
+    assert bytes(buf) == b''.join(blend565(0xF800, 0x001F, level)
+                                  .to_bytes(2, 'big') for level in levels)
+    # Missing letters are skipped silently
+    assert aa.get_letter('z', 0xFFFF)[1] == 0
+    assert aa.measure_text('AzB') == 3 + 1 + 2 + 1
+    assert capsys.readouterr().out == ''
+    atlas = GlyphAtlas(aa, 0xFFFF)
+    assert (render(display, 0, 0, 'AB', atlas, 0xFFFF) ==
+            render(display, 0, 0, 'AB', aa, 0xFFFF))
@@ -0,0 +1,58 @@
+"""Gradients wider than the chunk buffer are drawn in full."""
+import pytest
+
+import transport
+from st7789 import ST7789, color_ramp
+
+
+def make():
+    """240x320 panel in landscape, 320 pixels wide."""
+    display = ST7789(None, 240, 320, None, None, None, xstart=0, ystart=0,
+                     transport=transport.MockTransport())
+    display.rotation = 1
+    return display
+
+
+def ramp(color1, color2, steps):
+    return b''.join(c.to_bytes(2, 'big')
+                    for c in color_ramp(color1, color2, steps))
+
+
+def test_wide_horizontal():
+    display = make()
+    display.fill_gradient_h(0, 0, 320, 10, 0xF800, 0x001F)
+    row = ramp(0xF800, 0x001F, 320)
+    assert display.read_window(0, 0, 320, 10) == row * 10
+
+
+def test_wide_horizontal_clipped():
+    display = make()
+    display.push_clip(20, 0, 280, 4, translate=False)
+    display.fill_gradient_h(-30, 0, 350, 4, 0xF800, 0x001F)
+    display.pop_clip()
+    row = ramp(0xF800, 0x001F, 350)[100:660]
+    assert display.read_window(20, 0, 280, 4) == row * 4
+    assert not any(display.read_window(0, 0, 20, 4))
+
+
+def test_wide_vertical():
+    display = make()
+    display.fill_gradient_v(0, 0, 320, 10, 0x07E0, 0xFFFF)
+    out = display.read_window(0, 0, 320, 10)
+    for y, c in enumerate(color_ramp(0x07E0, 0xFFFF, 10)):
+        assert out[y * 640:(y + 1) * 640] == c.to_bytes(2, 'big') * 320
+
+
+@pytest.mark.parametrize('split', [200, 256])
+def test_wide_radial(split):
+    display = make()
+    display.fill_gradient_radial(0, 0, 320, 12, 0xFFFF, 0x0000)
+    # Same gradient drawn through two narrow clips
+    golden = make()
+    for x, w in ((0, split), (split, 320 - split)):
+        golden.push_clip(x, 0, w, 12, translate=False)
+        golden.fill_gradient_radial(0, 0, 320, 12, 0xFFFF, 0x0000)
+        golden.pop_clip()
+    out = display.read_window(0, 0, 320, 12)
+    assert any(out)
+    assert out == golden.read_window(0, 0, 320, 12)
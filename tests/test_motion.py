@@ -0,0 +1,106 @@
+"""MotionUpdater leaves the frame a full redraw would draw."""
+import random
+
+import pytest
+
+import transport
+from motion import MotionUpdater, exposed_rects
+from st7789 import ST7789
+
+PANEL = (52, 40, 135, 240)
+SPRITES = [(20, 16, 0xF800), (12, 30, 0x07E0), (25, 25, 0x001F)]
+
+
+def make(background):
+    display = ST7789(None, 135, 240, None, None, None,
+                     transport=transport.MockTransport())
+    paint(display, background)
+    return display
+
+
+def paint(display, background):
+    if isinstance(background, int):
+        display.fill(background)
+    else:
+        display.blit_buffer(background, 0, 0, 135, 240)
+
+
+def drawer(display, w, h, c):
+    # Two colors, so a sprite drawn at the wrong place shows
+    def draw(x, y):
+        display.fill_rect(x, y, w, h, c)
+        display.fill_rect(x + 2, y + 2, w - 4, 3, 0xFFFF)
+    return draw
+
+
+def redraw(background, positions, _painted={}):
+    """Reference frame: background, then every sprite in order."""
+    # The driver sleeps through its init sequence, so one display and
+    # painted background is kept per background
+    key = id(background)
+    if key not in _painted:
+        display = make(background)
+        _painted[key] = display, bytes(display.transport.gram)
+    display, gram = _painted[key]
+    display.transport.gram[:] = gram
+    for (w, h, c), pos in zip(SPRITES, positions):
+        if pos is not None:
+            drawer(display, w, h, c)(*pos)
+    return display.transport.frame(*PANEL)
+
+
+def backgrounds():
+    rnd = random.Random(1)
+    image = bytes(rnd.randrange(256) for _ in range(135 * 240 * 2))
+    return [0x0010, image]
+
+
+@pytest.mark.parametrize('background', backgrounds(), ids=['color', 'image'])
+@pytest.mark.parametrize('every', [1, 3])
+def test_matches_full_redraw(background, every):
+    # every > 1 flushes only some frames, like a loop dropping frames
+    display = make(background)
+    updater = MotionUpdater(display, background)
+    draws = [drawer(display, w, h, c) for w, h, c in SPRITES]
+    rnd = random.Random(every)
+    # Kept in a small area so the sprites often overlap
+    positions = [(20, 20), (30, 25), (25, 35)]
+    for step in range(12):
+        for i, (w, h, c) in enumerate(SPRITES):
+            x, y = positions[i]
+            # Mostly small steps, sometimes a jump, sometimes standing
+            d = rnd.choice((0, 4, 4, 4, 30))
+            x = min(max(x + rnd.randint(-d, d), -10), 60)
+            y = min(max(y + rnd.randint(-d, d), -10), 60)
+            positions[i] = (x, y)
+            updater.move(i, x, y, w, h, draws[i])
+        if step % every == every - 1:
+            updater.flush()
+            assert (display.transport.frame(*PANEL) ==
+                    redraw(background, positions))
+
+
+def test_remove():
+    display = make(0)
+    updater = MotionUpdater(display)
+    draws = [drawer(display, w, h, c) for w, h, c in SPRITES]
+    for i, (w, h, c) in enumerate(SPRITES):
+        updater.move(i, 30 + 10 * i, 30 + 10 * i, w, h, draws[i])
+    updater.flush()
+    updater.remove(1)
+    updater.flush()
+    assert (display.transport.frame(*PANEL) ==
+            redraw(0, [(30, 30), None, (50, 50)]))
+
+
+def test_small_step_restores_edges_only():
+    assert exposed_rects((10, 10, 20, 20), (12, 9, 20, 20)) == [
+        (10, 29, 20, 1), (10, 10, 2, 19)]
+    display = make(0)
+    updater = MotionUpdater(display)
+    draw = drawer(display, 20, 20, 0xF800)
+    updater.move('s', 10, 10, 20, 20, draw)
+    updater.flush()
+    updater.move('s', 12, 9, 20, 20, draw)
+    updater.flush()
+    assert updater.restored == 20 + 2 * 19
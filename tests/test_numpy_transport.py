@@ -0,0 +1,58 @@
+"""Golden image checks of NumpyTransport against MockTransport."""
+import zlib
+
+import pytest
+
+import transport
+from conftest import path
+from st7789 import ST7789
+
+np = pytest.importorskip('numpy')
+from numpy_transport import NumpyTransport  # noqa: E402
+
+PANEL = (52, 40, 135, 240)
+
+
+def draw(display, mode):
+    display.fill_gradient_h(0, 0, 135, 240, 0xF800, 0x001F)
+    # Every MADCTL address order, mirrored ones included
+    display._set_mem_access_mode(mode, False, False, False)
+    display.fill_circle(67, 100, 40, 0x07E0)
+    display.draw_image(path('images', 'Python41x49.raw'), 10, 10, 41, 49)
+    display.fill_rect(80, 100, 60, 30, 0xFFFF)
+
+
+@pytest.mark.parametrize('mode', range(8))
+def test_frames_match_mock(mode):
+    golden = ST7789(None, 135, 240, None, None, None,
+                    transport=transport.MockTransport())
+    draw(golden, mode)
+    model = NumpyTransport()
+    draw(ST7789(None, 135, 240, None, None, None, transport=model), mode)
+    assert model.frame(*PANEL) == golden.transport.frame(*PANEL)
+
+
+def test_save_png(tmp_path):
+    model = NumpyTransport()
+    display = ST7789(None, 135, 240, None, None, None, transport=model)
+    display.fill_rect(0, 0, 135, 240, 0xF800)
+    out = tmp_path / 'frame.png'
+    model.save(str(out), *PANEL)
+    data = out.read_bytes()
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    # Single IDAT chunk follows the 25 byte signature and IHDR
+    size = int.from_bytes(data[33:37], 'big')
+    rows = zlib.decompress(data[41:41 + size])
+    assert rows[:4] == b'\x00\xff\x00\x00'
+
+
+def test_save_ppm(tmp_path):
+    model = NumpyTransport()
+    display = ST7789(None, 135, 240, None, None, None, transport=model)
+    display.fill_rect(0, 0, 135, 240, 0x07E0)
+    out = tmp_path / 'frame.ppm'
+    model.save(str(out), *PANEL)
+    data = out.read_bytes()
+    header = b'P6\n135 240\n255\n'
+    assert data[:len(header)] == header
+    assert data[len(header):] == b'\x00\xff\x00' * (135 * 240)
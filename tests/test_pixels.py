@@ -0,0 +1,83 @@
+"""pixels() draws the same frame as one pixel() call per point."""
+import random
+from array import array
+
+import pytest
+
+import transport
+from st7789 import ST7789
+
+PANEL = (52, 40, 135, 240)
+
+
+def make():
+    display = ST7789(None, 135, 240, None, None, None,
+                     transport=transport.MockTransport())
+    display.fill(0x0010)
+    return display
+
+
+def points(n, w, h, seed):
+    rnd = random.Random(seed)
+    xs = array('h', (rnd.randrange(-5, w + 5) for _ in range(n)))
+    ys = array('h', (rnd.randrange(-5, h + 5) for _ in range(n)))
+    colors = array('H', (rnd.randrange(0x10000) for _ in range(n)))
+    return xs, ys, colors
+
+
+def single(xs, ys, colors, background=None):
+    """Reference frame: background under the box, then every point."""
+    display = make()
+    if background is not None:
+        x0 = min(xs)
+        y0 = min(ys)
+        display.fill_rect(x0, y0, max(xs) - x0 + 1, max(ys) - y0 + 1,
+                          background)
+    for x, y, c in zip(xs, ys, colors):
+        display.pixel(x, y, c)
+    return display.transport.frame(*PANEL)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_sparse_runs(seed):
+    xs, ys, colors = points(300, 135, 240, seed)
+    display = make()
+    display.pixels(xs, ys, colors)
+    assert display.transport.frame(*PANEL) == single(xs, ys, colors)
+
+
+def test_duplicates_keep_last():
+    xs = array('h', [4, 5, 4, 6])
+    ys = array('h', [9, 9, 9, 9])
+    colors = array('H', [0xF800, 0x07E0, 0x001F, 0xFFFF])
+    display = make()
+    display.pixels(xs, ys, colors)
+    assert display.transport.frame(*PANEL) == single(xs, ys, colors)
+
+
+def test_single_color():
+    xs, ys, _ = points(100, 135, 240, 7)
+    display = make()
+    display.pixels(xs, ys, 0xFFE0)
+    assert display.transport.frame(*PANEL) == single(xs, ys, [0xFFE0] * 100)
+
+
+@pytest.mark.parametrize('size', [(20, 20), (135, 240)])
+def test_background(size):
+    # Dense points send their bounding box, sparse ones joined runs
+    xs, ys, colors = points(200, size[0], size[1], 3)
+    display = make()
+    display.pixels(xs, ys, colors, background=0x1234)
+    expected = make()
+    for x, y, c in zip(xs, ys, colors):
+        expected.pixel(x, y, c)
+    frame = display.transport.frame(*PANEL)
+    if size == (20, 20):
+        assert frame == single(xs, ys, colors, 0x1234)
+    else:
+        # Only gaps inside a joined run take the background
+        a = expected.transport.frame(*PANEL)
+        for i in range(0, len(frame), 2):
+            if frame[i:i + 2] != a[i:i + 2]:
+                assert frame[i:i + 2] == b'\x12\x34'
+                assert a[i:i + 2] == b'\x00\x10'
@@ -0,0 +1,38 @@
+"""read_window() returns what blit_buffer() wrote, in every rotation."""
+import pytest
+
+import transport
+from st7789 import ST7789
+
+
+def make(model):
+    return ST7789(None, 135, 240, None, None, None, transport=model)
+
+
+@pytest.mark.parametrize('rotation', range(4))
+def test_round_trip(rotation):
+    display = make(transport.MockTransport())
+    display.rotation = rotation
+    w, h = 13, 7
+    buf = bytearray(range(256)) * 2
+    buf = buf[:w * h * 2]
+    display.blit_buffer(buf, 5, 9, w, h)
+    assert display.read_window(5, 9, w, h) == buf
+    # Pixels outside the clip are left as they were
+    display.push_clip(5, 9, 4, h)
+    into = bytearray(w * h * 2)
+    display.read_window(0, 0, w, h, into)
+    display.pop_clip()
+    for row in range(h):
+        start = row * w * 2
+        assert into[start:start + 8] == buf[start:start + 8]
+        assert not any(into[start + 8:start + w * 2])
+
+
+def test_numpy_round_trip():
+    pytest.importorskip('numpy')
+    from numpy_transport import NumpyTransport
+    display = make(NumpyTransport())
+    buf = bytes(range(200))
+    display.blit_buffer(buf, 30, 40, 10, 10)
+    assert display.read_window(30, 40, 10, 10) == buf
@@ -0,0 +1,41 @@
+"""Floyd-Steinberg dithering matches a pixel by pixel reference."""
+import pytest
+
+np = pytest.importorskip('numpy')
+import rgb565_convert  # noqa: E402
+
+
+def reference(rgb):
+    """Textbook error diffusion, one pixel and channel at a time."""
+    work = rgb.astype(np.float64)
+    h, w = work.shape[:2]
+    out = np.empty_like(rgb)
+    for y in range(h):
+        for x in range(w):
+            for c, mask in enumerate((0xF8, 0xFC, 0xF8)):
+                old = min(max(work[y, x, c], 0.0), 255.0)
+                new = int(old) & mask
+                out[y, x, c] = new
+                err = old - new
+                if x + 1 < w:
+                    work[y, x + 1, c] += err * 7 / 16
+                if y + 1 < h:
+                    if x:
+                        work[y + 1, x - 1, c] += err * 3 / 16
+                    work[y + 1, x, c] += err * 5 / 16
+                    if x + 1 < w:
+                        work[y + 1, x + 1, c] += err * 1 / 16
+    return out
+
+
+def test_matches_reference():
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, size=(13, 17, 3), dtype=np.uint8)
+    assert (rgb565_convert.dither_floyd_steinberg(rgb) ==
+            reference(rgb)).all()
+
+
+def test_keeps_mean_of_flat_color():
+    rgb = np.full((32, 32, 3), (100, 50, 203), dtype=np.uint8)
+    out = rgb565_convert.dither_floyd_steinberg(rgb)
+    assert np.abs(out.mean(axis=(0, 1)) - (100, 50, 203)).max() < 1
@@ -0,0 +1,39 @@
+"""Traces recorded through FileTransport replay and compare."""
+import io
+
+import spi_trace
+import transport
+from st7789 import ST7789
+
+
+def record(draw):
+    """Return a Replayer fed with the trace of draw."""
+    stream = io.BytesIO()
+    display = ST7789(None, 135, 240, None, None, None,
+                     transport=transport.FileTransport(stream))
+    draw(display)
+    replayer = spi_trace.Replayer()
+    replayer.feed(stream.getvalue())
+    return replayer
+
+
+def rows(display):
+    for y in range(20, 80):
+        display.hline(10, y, 100, 0xF81F)
+
+
+def rect(display):
+    display.fill_rect(10, 20, 100, 60, 0xF81F)
+
+
+def test_compare_frame_equal():
+    result = spi_trace.compare(record(rows), record(rect))
+    assert result['frame_equal']
+    before, after = result['transactions']
+    assert after < before
+
+
+def test_compare_frame_differs():
+    def other(display):
+        display.fill_rect(10, 20, 100, 60, 0x07E0)
+    assert not spi_trace.compare(record(rect), record(other))['frame_equal']
@@ -0,0 +1,64 @@
+"""CommandQueue and FileTransport behave like the transports they stand for."""
+import io
+
+import pytest
+
+import transport
+from conftest import path
+from st7789 import ST7789
+from xglcd_font import XglcdFont
+
+PANEL = (52, 40, 135, 240)
+IMAGE = path('images', 'Python41x49.raw')
+
+
+@pytest.fixture(scope='module')
+def font():
+    return XglcdFont(path('fonts', 'Unispace12x24.c'), 12, 24)
+
+
+def make(model):
+    return ST7789(None, 135, 240, None, None, None, transport=model)
+
+
+def scene(display, font):
+    """Draw a bit of everything."""
+    display.fill(0x0010)
+    display.fill_rect(3, 4, 50, 60, 0xF800)
+    display.line(0, 0, 134, 239, 0x07E0)
+    display.fill_circle(60, 160, 25, 0x001F)
+    display.draw_image(IMAGE, 80, 20, 41, 49)
+    display.draw_text(5, 100, 'Hi 42', font, 0xFFE0, 0x0010)
+    display.draw_text(100, 230, 'Up', font, 0xFFFF, landscape=True)
+
+
+def test_command_queue_matches_mock(font):
+    plain = make(transport.MockTransport())
+    scene(plain, font)
+    queue = transport.CommandQueue(transport.MockTransport())
+    queued = make(queue)
+    scene(queued, font)
+    queued.flush()
+    assert queue.transport.frame(*PANEL) == plain.transport.frame(*PANEL)
+    assert queue.bursts == queue.transport.writes
+    assert queue.transport.writes < plain.transport.writes
+
+
+class Bus(object):
+    """Stand-in SPI bus answering reads with a fixed byte."""
+
+    def write(self, buf):
+        pass
+
+    def readinto(self, buf, write=0x00):
+        for i in range(len(buf)):
+            buf[i] = 0xA5
+
+
+def test_file_transport_reads_need_a_bus():
+    display = make(transport.FileTransport(io.BytesIO()))
+    with pytest.raises(RuntimeError):
+        display.read_window(0, 0, 2, 2)
+    display = make(transport.FileTransport(io.BytesIO(), Bus()))
+    # Dummy byte, then 6 bits per channel of 0xA5
+    assert display.read_window(0, 0, 1, 1) == b'\xa5\x34'
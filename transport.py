@@ -0,0 +1,240 @@
+"""Transports carrying ST7789 commands and data to a panel, file or viewer.
+
+ST7789 sends every byte through a transport object with three methods:
+    command(c)  send one command byte (DC low)
+    data(buf)   send data bytes, or a single byte given as an int (DC high)
+    flush()     send anything still queued
+plus readinto(c, buf) to send a read command and receive its reply, and
+deinit() to release the bus.  Swapping the transport changes where the
+bytes go without touching drawing code:
+    display = ST7789(None, 135, 240, rst=None, dc=None, cs=None,
+                     transport=CommandQueue(MockTransport()))
+
+SPITransport drives machine.SPI with DC/CS pins (the default), MockTransport
+keeps a model of the controller frame memory, FileTransport records a
+spi_trace file and SocketTransport streams the same records to a viewer on
+the desktop (see serve()).  CommandQueue wraps any of them and merges
+consecutive data writes into bursts.
+"""
+from spi_trace import Recorder, Replayer
+from st7789 import SPITransport
+
+_GRAM_WIDTH = 240
+_GRAM_HEIGHT = 320
+
+_RAMRD = 0x2E
+_MADCTL_MY = 0x80
+_MADCTL_MX = 0x40
+_MADCTL_MV = 0x20
+
+
+class MockTransport(Replayer):
+    """In-memory controller model, see spi_trace.Replayer for attributes.
+
+    Frame memory and transfer counters are updated as the driver writes,
+    e.g. to benchmark drawing code on the host or compare its output.
+    RAMRD is answered from frame memory, so reads can be tested too.
+    """
+
+    def data(self, data):
+        if type(data) == type(1):
+            data = bytes([data])
+        Replayer.data(self, data)
+
+    def readinto(self, command, buf):
+        self.command(command)
+        for i in range(len(buf)):
+            buf[i] = 0
+        if command != _RAMRD:
+            return
+        c0, c1 = self._columns
+        r0, r1 = self._rows
+        col = c0
+        row = r0
+        madctl = self._madctl
+        # Dummy byte, then 6 bits per channel in the top of each byte
+        for i in range(1, len(buf) - 2, 3):
+            x, y = (row, col) if madctl & _MADCTL_MV else (col, row)
+            if madctl & _MADCTL_MX:
+                x = _GRAM_WIDTH - 1 - x
+            if madctl & _MADCTL_MY:
+                y = _GRAM_HEIGHT - 1 - y
+            if 0 <= x < _GRAM_WIDTH and 0 <= y < _GRAM_HEIGHT:
+                pos = (y * _GRAM_WIDTH + x) * 2
+                color = self.gram[pos] << 8 | self.gram[pos + 1]
+                r = color >> 11
+                g = color >> 5 & 0x3F
+                b = color & 0x1F
+                buf[i] = (r << 1 | r >> 4) << 2
+                buf[i + 1] = g << 2
+                buf[i + 2] = (b << 1 | b >> 4) << 2
+            if col < c1:
+                col += 1
+            else:
+                col = c0
+                row = row + 1 if row < r1 else r0
+
+    def flush(self):
+        pass
+
+    def deinit(self):
+        pass
+
+
+class FileTransport(SPITransport):
+    """Record traffic to a spi_trace file instead of a bus.
+
+    Attributes:
+        recorder (Recorder): Trace recorder, e.g. to close the file.
+    """
+
+    def __init__(self, stream, spi=None):
+        """Constructor for FileTransport object.
+
+        Args:
+            stream: Binary file-like object the trace is written to.
+            spi (SPI): Real bus to forward writes to and read from
+                (default: None).
+        """
+        self.recorder = Recorder(stream, spi)
+        SPITransport.__init__(self, self.recorder.spi, self.recorder.dc,
+                              self.recorder.cs)
+        self._stream = stream
+        self._bus = spi
+
+    def readinto(self, command, buf):
+        # Replies are not recorded, only a real bus can answer
+        if self._bus is None:
+            raise RuntimeError('FileTransport cannot read without a real bus')
+        SPITransport.readinto(self, command, buf)
+
+    def flush(self):
+        flush = getattr(self._stream, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def deinit(self):
+        self.flush()
+        self.recorder.spi.deinit()
+
+
+class SocketTransport(FileTransport):
+    """Stream trace records over TCP to a viewer running serve()."""
+
+    def __init__(self, host='127.0.0.1', port=7789):
+        """Constructor for SocketTransport object.
+
+        Args:
+            host (string): Viewer address (default: local host).
+            port (int): Viewer port (default: 7789).
+        """
+        try:
+            import usocket as socket
+        except ImportError:
+            import socket
+        self._socket = socket.socket()
+        self._socket.connect(socket.getaddrinfo(host, port)[0][-1])
+        FileTransport.__init__(self, self._socket.makefile('wb'))
+
+    def deinit(self):
+        FileTransport.deinit(self)
+        self._stream.close()
+        self._socket.close()
+
+
+class CommandQueue(object):
+    """Merge consecutive data writes into bursts before a transport.
+
+    Data is copied into a fixed buffer and sent when the next command is
+    issued, the buffer is full or flush() is called.  Writes at least as
+    large as the buffer are sent directly.
+
+    Attributes:
+        transport: Wrapped transport.
+        bursts (int): Data writes sent to the transport.
+    """
+
+    def __init__(self, transport, burst=1024):
+        """Constructor for CommandQueue object.
+
+        Args:
+            transport: Transport to send to, e.g. SPITransport.
+            burst (int): Largest merged write in bytes (default: 1024).
+        """
+        self.transport = transport
+        self._buf = bytearray(burst)
+        self._mv = memoryview(self._buf)
+        self._n = 0
+        self.bursts = 0
+
+    def command(self, command):
+        if self._n:
+            self.flush()
+        self.transport.command(command)
+
+    def data(self, data):
+        n = self._n
+        if type(data) == type(1):
+            if n == len(self._buf):
+                self.flush()
+                n = 0
+            self._buf[n] = data
+            self._n = n + 1
+            return
+        size = len(data)
+        if n + size > len(self._buf):
+            if n:
+                self.flush()
+                n = 0
+            if size >= len(self._buf):
+                self.bursts += 1
+                self.transport.data(data)
+                return
+        self._mv[n:n + size] = data
+        self._n = n + size
+
+    def readinto(self, command, buf):
+        if self._n:
+            self.flush()
+        self.transport.readinto(command, buf)
+
+    def flush(self):
+        if self._n:
+            self.bursts += 1
+            self.transport.data(self._mv[:self._n])
+            self._n = 0
+        self.transport.flush()
+
+    def deinit(self):
+        self.flush()
+        self.transport.deinit()
+
+
+def serve(port=7789, replayer=None):
+    """Receive trace records from a SocketTransport until it disconnects.
+
+    Args:
+        port (int): Port to listen on (default: 7789).
+        replayer (Replayer): Model to feed, e.g. a subclass drawing its
+            frame memory in a window (default: new Replayer).
+    Returns:
+        Replayer: Frame memory and transfer totals of the session.
+    """
+    import socket
+    if replayer is None:
+        replayer = Replayer()
+    server = socket.socket()
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(('', port))
+    server.listen(1)
+    conn = server.accept()[0]
+    try:
+        while True:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            replayer.feed(chunk)
+    finally:
+        conn.close()
+        server.close()
+    return replayer
@@ -70,6 +70,24 @@ class XglcdFont(object):
                     int(b, 16) for b in line.split(','))
                 offset += bytes_per_letter
 
+    def _glyph(self, letter):
+        """Return the width byte and column bytes of a letter.
+
+        Args:
+            letter (string): Letter to look up.
+        Returns:
+            memoryview: Letter data, or None if the font does not contain it.
+        """
+        letter_ord = ord(letter) - self.start_letter
+        if not 0 <= letter_ord < self.letter_count:
+            return None
+        offset = letter_ord * self.bytes_per_letter
+        return memoryview(self.letters)[offset:offset + self.bytes_per_letter]
+
+    def codepoints(self):
+        """Return the codepoints of all letters in the font."""
+        return range(self.start_letter, self.start_letter + self.letter_count)
+
     def lit_bits(self, n):
         """Return positions of 1 bits only."""
         while n:
@@ -81,23 +99,19 @@ class XglcdFont(object):
         """Convert letter byte data to pixels.
 
         Args:
-            letter (string): Letter to return (must exist within font).
+            letter (string): Letter to return, width 0 if not in the font.
             color (int): RGB565 color value.
             background (int): RGB565 background color (default: black).
             landscape (bool): Orientation (default: False = portrait)
+                ST7789.draw_text rotates portrait data in hardware instead.
         Returns:
             (bytearray): Pixel data.
             (int, int): Letter width and height.
         """
-        # Get index of letter
-        letter_ord = ord(letter) - self.start_letter
-        # Confirm font contains letter
-        if letter_ord >= self.letter_count:
-            print('Font does not contain character: ' + letter)
+        mv = self._glyph(letter)
+        # Missing letters are skipped, sparse fonts leave many out
+        if mv is None:
             return b'', 0, 0
-        bytes_per_letter = self.bytes_per_letter
-        offset = letter_ord * bytes_per_letter
-        mv = memoryview(self.letters[offset:offset + bytes_per_letter])
 
         # Get width of letter (specified by first byte)
         letter_width = mv[0]
@@ -151,9 +165,9 @@ class XglcdFont(object):
         """
         length = 0
         for letter in text:
-            # Get index of letter
-            letter_ord = ord(letter) - self.start_letter
-            offset = letter_ord * self.bytes_per_letter
+            mv = self._glyph(letter)
+            if mv is None:
+                continue
             # Add length of letter and spacing
-            length += self.letters[offset] + spacing
+            length += mv[0] + spacing
         return length